@@ -0,0 +1,7 @@
+"""Vectorized counterparts of the `hvac` calculations in the book.
+
+The notebooks solve one operating point at a time with `hvac` objects and pint
+quantities. For studies with many zones, many operating points or a whole
+year of weather data, the modules of this package do the same calculations
+with NumPy arrays of plain floats in SI units.
+"""
@@ -0,0 +1,180 @@
+"""Selection of the supply air state of a single-zone CAV system.
+
+In `cav_design` the supply air temperature is chosen first; the space
+condition line then fixes the supply air humidity ratio and mass flow rate,
+and the supply fan and the cooling coil follow. `sweep_summer` does these
+steps for a whole grid of supply air temperatures (and, optionally, relative
+humidities of the air leaving the cooling coil, when the air is reheated
+after the coil) at once, and `pareto_front` picks the designs for which no
+other design has a lower cooling coil load, reheat load, fan power and supply
+air flow rate at the same time::
+
+    results = sweep_summer(T_supply=np.linspace(11.0, 16.0, 1000), ...)
+    best = results['pareto'] & results['feasible']
+
+All quantities are in SI units (see `batch.psychrometrics`).
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from . import psychrometrics as psy
+from .psychrometrics import ArrayLike
+from .space import supply_air_at_Tdb
+
+
+# units of the entries in the dict returned by `sweep_summer` (see
+# `batch.records`)
+RESULT_UNITS = {
+    'T_supply': 'degC',
+    'RH_cooled': '',
+    'W_supply': 'kg / kg',
+    'm_supply': 'kg / s',
+    'V_supply': 'm ** 3 / s',
+    'm_vent': 'kg / s',
+    'T_mixed': 'degC',
+    'W_mixed': 'kg / kg',
+    'T_cooled': 'degC',
+    'W_cooled': 'kg / kg',
+    'T_reheated': 'degC',
+    'm_condensate': 'kg / s',
+    'Q_cooling_coil': 'W',
+    'Q_reheat_coil': 'W',
+    'W_fan': 'W'
+}
+
+# the criteria of `pareto_front` in `sweep_summer`: all to be minimized
+OBJECTIVES = ('Q_cooling_coil', 'Q_reheat_coil', 'W_fan', 'V_supply')
+
+
+def pareto_front(objectives: np.ndarray, block_size: int = 1024) -> np.ndarray:
+    """Return a boolean array that is True for the rows of `objectives`
+    (shape (n, k), all to be minimized) that are not dominated by another
+    row, i.e. no other row is at least as good in every column and better in
+    at least one.
+
+    The rows are compared in blocks of `block_size` rows, which limits the
+    memory used to `block_size` * n * k booleans.
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    n = len(objectives)
+    non_dominated = np.ones(n, dtype=bool)
+    for start in range(0, n, block_size):
+        block = objectives[start:start + block_size, np.newaxis, :]
+        no_worse = np.all(objectives[np.newaxis, :, :] <= block, axis=2)
+        better = np.any(objectives[np.newaxis, :, :] < block, axis=2)
+        non_dominated[start:start + block_size] = ~np.any(no_worse & better, axis=1)
+    return non_dominated
+
+
+def sweep_summer(
+    T_supply: ArrayLike,
+    T_zone: float,
+    W_zone: float,
+    Q_zone: float,
+    SHR_zone: float,
+    T_outdoor: float,
+    W_outdoor: float,
+    V_vent: float,
+    fan_pressure: float,
+    fan_efficiency: float,
+    motor_efficiency: float = 1.0,
+    RH_cooled: Optional[ArrayLike] = None,
+    objectives: Sequence[str] = OBJECTIVES,
+    P: float = psy.P_ATM
+) -> Dict[str, np.ndarray]:
+    """Summer design of a single-zone CAV system for a grid of supply air
+    states.
+
+    The air leaving the cooling coil is heated by the supply fan (the fan and
+    its motor are in the air stream) and, if `RH_cooled` is given, by a
+    reheat coil before it enters the zone. The return air has the state of
+    the zone air.
+
+    Params:
+    - T_supply : ArrayLike
+        Supply air temperatures to evaluate (°C).
+    - T_zone, W_zone : float
+        Zone air state.
+    - Q_zone, SHR_zone : float
+        Cooling load of the zone (W) and its sensible heat ratio (fraction).
+    - T_outdoor, W_outdoor : float
+        Outdoor air state.
+    - V_vent : float
+        Volume flow rate of ventilation air (m³/s).
+    - fan_pressure : float
+        Supply fan pressure (Pa).
+    - fan_efficiency, motor_efficiency : float
+        Efficiencies of the supply fan and its motor (fractions).
+    - RH_cooled : ArrayLike, optional
+        Relative humidities of the air leaving the cooling coil (fraction).
+        If given, every supply air temperature is combined with every
+        relative humidity (the results have shape (len(T_supply),
+        len(RH_cooled))) and the air is reheated from the coil leaving
+        temperature to the fan inlet temperature. If omitted, there is no
+        reheat coil and the cooling coil leaving temperature follows from
+        the fan heating.
+    - objectives : Sequence[str]
+        The results used to determine the Pareto front.
+
+    Returns a dict of arrays. Besides the air states, flow rates and loads
+    (see `RESULT_UNITS`):
+    - 'feasible': the design is physically possible: the supply air is
+      colder than the zone air, the ventilation air flow rate does not
+      exceed the supply air flow rate, the cooling coil cools and does not
+      humidify the air, the air leaving the coil is not supersaturated and
+      the reheat coil does not cool;
+    - 'pareto': the design is feasible and on the Pareto front of the
+      feasible designs.
+    """
+    T_supply = np.asarray(T_supply, dtype=float)
+    if RH_cooled is not None:
+        T_supply, RH_cooled = np.meshgrid(T_supply, np.asarray(RH_cooled, dtype=float), indexing='ij')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        W_supply, m_supply = supply_air_at_Tdb(T_zone, W_zone, Q_zone, SHR_zone, T_supply)
+        V_supply = m_supply * psy.specific_volume(T_supply, W_supply, P)
+        W_fan = V_supply * fan_pressure / (fan_efficiency * motor_efficiency)
+        dT_fan = W_fan / (m_supply * psy.cp_humid(W_supply))
+        T_reheated = T_supply - dT_fan
+        if RH_cooled is None:
+            T_cooled = T_reheated
+            RH_cooled = psy.RH_from_W(T_cooled, W_supply, P)
+        else:
+            # the coil leaving temperature at which the air has humidity
+            # ratio W_supply and relative humidity RH_cooled
+            T_cooled = psy.dew_point(psy.W_from_pw(psy.pw_from_W(W_supply, P) / RH_cooled, P), P)
+        Q_reheat_coil = m_supply * psy.cp_humid(W_supply) * (T_reheated - T_cooled)
+        m_vent = psy.density(T_outdoor, W_outdoor, P) * V_vent
+        T_mixed, W_mixed = psy.mix(m_vent, T_outdoor, W_outdoor, m_supply - m_vent, T_zone, W_zone)
+        m_condensate = m_supply * (W_mixed - W_supply)
+        Q_cooling_coil = (
+            m_supply * (psy.enthalpy(T_mixed, W_mixed) - psy.enthalpy(T_cooled, W_supply))
+            - m_condensate * psy.CP_W * T_cooled
+        )
+    feasible = (
+        (T_supply < T_zone) & (m_supply >= m_vent) & (T_cooled < T_mixed)
+        & (m_condensate >= 0.0) & (RH_cooled <= 1.0) & (Q_reheat_coil >= -1.0e-9)
+    )
+    results = {
+        'T_supply': T_supply,
+        'RH_cooled': RH_cooled,
+        'W_supply': W_supply,
+        'm_supply': m_supply,
+        'V_supply': V_supply,
+        'm_vent': np.broadcast_to(m_vent, T_supply.shape),
+        'T_mixed': T_mixed,
+        'W_mixed': W_mixed,
+        'T_cooled': T_cooled,
+        'W_cooled': W_supply,
+        'T_reheated': T_reheated,
+        'm_condensate': m_condensate,
+        'Q_cooling_coil': Q_cooling_coil,
+        'Q_reheat_coil': np.maximum(Q_reheat_coil, 0.0),
+        'W_fan': W_fan,
+        'feasible': feasible
+    }
+    pareto = np.zeros(T_supply.shape, dtype=bool)
+    candidates = np.column_stack([results[name][feasible] for name in objectives])
+    pareto[feasible] = pareto_front(candidates)
+    results['pareto'] = pareto
+    return results
@@ -0,0 +1,285 @@
+"""Rating of a chilled-water cooling coil at off-design conditions.
+
+`AirConditioningProcess` determines the load, the apparatus dew point (ADP)
+and the contact factor `beta` of a cooling coil when the entering and leaving
+air states are known: the leaving state is chosen by the designer (e.g. 58 °F
+and 80 % RH in the notebooks). In an annual simulation the coil is given and
+the leaving state follows from the entering air, the air flow rate and the
+chilled water. `CoolingCoil` predicts it:
+
+- The heat transfer is calculated with the enthalpy-based effectiveness-NTU
+  method (Braun et al., 1989) for a counterflow coil whose surface is wet,
+  and with the ordinary effectiveness-NTU method for a dry coil. The larger
+  of both loads is taken (the coil is partly wet in between).
+- The leaving air state follows from the bypass factor `BF = 1 - beta =
+  exp(-NTU_o)` of the air side: the air leaving the coil is a mix of air at
+  the effective coil surface state (the ADP) and bypassed air at the
+  entering state.
+
+The air-side and water-side conductances are calibrated from one design
+point (`CoolingCoil.from_design_point`, or `CoolingCoil.from_process` for an
+`AirConditioningProcess` of `hvac`) and scale with the air and water flow
+rates to the power 0.8 (forced convection).
+
+All quantities are in SI units (see `batch.psychrometrics`).
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from . import psychrometrics as psy
+from .psychrometrics import ArrayLike
+
+
+RESULT_UNITS = {
+    'T_air_out': 'degC',
+    'W_air_out': 'kg / kg',
+    'T_water_out': 'degC',
+    'Q': 'W',
+    'Q_sen': 'W',
+    'm_condensate': 'kg / s',
+    'T_adp': 'degC',
+    'BF': ''
+}
+
+
+def _h_saturated(T: ArrayLike, P: ArrayLike = psy.P_ATM) -> ArrayLike:
+    """Enthalpy of saturated air at temperature `T`."""
+    return psy.enthalpy(T, psy.W_saturated(T, P))
+
+
+def _T_saturated(h: ArrayLike, P: ArrayLike = psy.P_ATM, tol: float = 1.0e-6) -> np.ndarray:
+    """Temperature of saturated air with enthalpy `h` (vectorized
+    bisection)."""
+    h = np.asarray(h, dtype=float)
+    lo = np.full_like(h, -40.0)
+    hi = np.full_like(h, 60.0)
+    while np.any(hi - lo > tol):
+        mid = 0.5 * (lo + hi)
+        too_high = _h_saturated(mid, P) > h
+        hi = np.where(too_high, mid, hi)
+        lo = np.where(too_high, lo, mid)
+    return 0.5 * (lo + hi)
+
+
+def _effectiveness(NTU: ArrayLike, Cr: ArrayLike) -> np.ndarray:
+    """Effectiveness of a counterflow heat exchanger."""
+    NTU, Cr = np.broadcast_arrays(np.asarray(NTU, dtype=float), np.asarray(Cr, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        e = np.exp(-NTU * (1.0 - Cr))
+        eps = (1.0 - e) / (1.0 - Cr * e)
+    return np.where(np.isclose(Cr, 1.0), NTU / (1.0 + NTU), eps)
+
+
+def _NTU(eps: float, Cr: float) -> float:
+    """Number of transfer units of a counterflow heat exchanger with
+    effectiveness `eps` (the inverse of `_effectiveness`)."""
+    if np.isclose(Cr, 1.0):
+        return eps / (1.0 - eps)
+    return np.log((1.0 - eps * Cr) / (1.0 - eps)) / (1.0 - Cr)
+
+
+def _apparatus_dew_point(T_in: float, W_in: float, T_out: float, W_out: float, P: float = psy.P_ATM) -> float:
+    """Temperature where the straight line through the entering and leaving
+    air states first crosses the saturation curve below `T_out` (stepping
+    down in steps of 0.1 K, then bisection)."""
+    slope = (W_in - W_out) / (T_in - T_out)
+
+    def above_line(T):
+        return psy.W_saturated(T, P) > W_out + slope * (T - T_out)
+
+    if not above_line(T_out):
+        raise ValueError('the air leaving the coil is supersaturated')
+    hi = T_out
+    lo = hi - 0.1
+    while above_line(lo):
+        if lo < -40.0:
+            raise ValueError('the coil process line does not cross the saturation curve')
+        hi, lo = lo, lo - 0.1
+    while hi - lo > 1.0e-9:
+        mid = 0.5 * (lo + hi)
+        if above_line(mid):
+            hi = mid
+        else:
+            lo = mid
+    return 0.5 * (lo + hi)
+
+
+class CoolingCoil:
+    """A chilled-water cooling coil of given size.
+
+    Params:
+    - UA_air : float
+        Air-side conductance at design air flow rate, on an enthalpy basis
+        (h_o * A_o / cp, kg/s).
+    - UA_water : float
+        Water-side conductance (including the tube wall) at design water
+        flow rate (W/K).
+    - m_da_design : float
+        Design mass flow rate of dry air (kg/s).
+    - m_water_design : float
+        Design mass flow rate of chilled water (kg/s).
+    - n_air, n_water : float
+        Exponents of the air and water flow rates by which the conductances
+        scale.
+    """
+    def __init__(
+        self,
+        UA_air: float,
+        UA_water: float,
+        m_da_design: float,
+        m_water_design: float,
+        n_air: float = 0.8,
+        n_water: float = 0.8
+    ):
+        self.UA_air = UA_air
+        self.UA_water = UA_water
+        self.m_da_design = m_da_design
+        self.m_water_design = m_water_design
+        self.n_air = n_air
+        self.n_water = n_water
+
+    @classmethod
+    def from_design_point(
+        cls,
+        m_da: float,
+        T_air_in: float,
+        W_air_in: float,
+        T_air_out: float,
+        W_air_out: float,
+        T_water_in: float,
+        T_water_out: float,
+        n_air: float = 0.8,
+        n_water: float = 0.8,
+        P: float = psy.P_ATM
+    ) -> 'CoolingCoil':
+        """Size the coil that cools and dehumidifies `m_da` kg/s of air from
+        (`T_air_in`, `W_air_in`) to (`T_air_out`, `W_air_out`) with chilled
+        water entering at `T_water_in` and leaving at `T_water_out`.
+        """
+        if not W_air_out < W_air_in:
+            raise ValueError('the design point must be a dehumidifying (wet) coil')
+        Q = m_da * (psy.enthalpy(T_air_in, W_air_in) - psy.enthalpy(T_air_out, W_air_out))
+        m_water = Q / (psy.CP_W * (T_water_out - T_water_in))
+        # air side: the bypass factor of the coil
+        T_adp = _apparatus_dew_point(T_air_in, W_air_in, T_air_out, W_air_out, P)
+        BF = (T_air_out - T_adp) / (T_air_in - T_adp)
+        UA_air = -np.log(BF) * m_da
+        # overall conductance on an enthalpy basis, from the effectiveness
+        c_s = (_h_saturated(T_water_out, P) - _h_saturated(T_water_in, P)) / (T_water_out - T_water_in)
+        C_air, C_water = m_da, m_water * psy.CP_W / c_s
+        C_min, C_max = min(C_air, C_water), max(C_air, C_water)
+        eps = Q / (C_min * (psy.enthalpy(T_air_in, W_air_in) - _h_saturated(T_water_in, P)))
+        if not 0.0 < eps < 1.0:
+            raise ValueError(f'the design point is not attainable (effectiveness {eps:.3f})')
+        UA = _NTU(eps, C_min / C_max) * C_min
+        R_water = 1.0 / UA - 1.0 / UA_air
+        if R_water <= 0.0:
+            raise ValueError(
+                'the design point is not attainable: the chilled water is too warm '
+                'for the bypass factor of the coil'
+            )
+        return cls(float(UA_air), float(c_s / R_water), m_da, float(m_water), n_air, n_water)
+
+    @classmethod
+    def from_process(cls, cooling_coil, T_water_in, T_water_out, n_air: float = 0.8, n_water: float = 0.8) -> 'CoolingCoil':
+        """Size the coil of an `hvac.air_conditioning.AirConditioningProcess`
+        (e.g. the cooling coil of the CAV design notebook), with the entering
+        and leaving chilled water temperatures as quantities."""
+        return cls.from_design_point(
+            cooling_coil.m_da.to('kg / s').m,
+            cooling_coil.air_in.Tdb.to('degC').m,
+            cooling_coil.air_in.W.to('kg / kg').m,
+            cooling_coil.air_out.Tdb.to('degC').m,
+            cooling_coil.air_out.W.to('kg / kg').m,
+            T_water_in.to('degC').m,
+            T_water_out.to('degC').m,
+            n_air, n_water
+        )
+
+    def rate(
+        self,
+        m_da: ArrayLike,
+        T_air_in: ArrayLike,
+        W_air_in: ArrayLike,
+        T_water_in: ArrayLike,
+        m_water: Optional[ArrayLike] = None,
+        P: ArrayLike = psy.P_ATM,
+        n_iter: int = 5
+    ) -> Dict[str, np.ndarray]:
+        """Predict the performance of the coil.
+
+        Params:
+        - m_da : ArrayLike
+            Mass flow rates of dry air through the coil (kg/s, > 0).
+        - T_air_in, W_air_in : ArrayLike
+            Entering air states.
+        - T_water_in : ArrayLike
+            Entering chilled water temperatures (°C).
+        - m_water : ArrayLike, optional
+            Chilled water flow rates (kg/s); the design flow rate if omitted.
+        - n_iter : int
+            Number of passes to update the slope of the saturation curve
+            with the leaving water temperature.
+
+        Returns a dict of arrays (see `RESULT_UNITS`): the leaving air state
+        `T_air_out`, `W_air_out`, the leaving water temperature
+        `T_water_out`, the total and sensible load `Q` and `Q_sen`, the
+        condensate flow rate `m_condensate`, the apparatus dew point `T_adp`
+        and the bypass factor `BF`.
+        """
+        if m_water is None:
+            m_water = self.m_water_design
+        m_da, T_air_in, W_air_in, T_water_in, m_water = np.broadcast_arrays(
+            *(np.asarray(a, dtype=float) for a in (m_da, T_air_in, W_air_in, T_water_in, m_water))
+        )
+        UA_air = self.UA_air * (m_da / self.m_da_design) ** self.n_air
+        UA_water = self.UA_water * (m_water / self.m_water_design) ** self.n_water
+        C_water = m_water * psy.CP_W
+        h_air_in = psy.enthalpy(T_air_in, W_air_in)
+        # wet coil, with the slope c_s of the saturation curve between the
+        # entering and leaving water temperature
+        T_water_out = T_water_in + 5.0
+        for _ in range(n_iter):
+            T_water_out = np.maximum(T_water_out, T_water_in + 0.1)
+            c_s = (_h_saturated(T_water_out, P) - _h_saturated(T_water_in, P)) / (T_water_out - T_water_in)
+            UA = 1.0 / (c_s / UA_water + 1.0 / UA_air)
+            C_min, C_max = np.minimum(m_da, C_water / c_s), np.maximum(m_da, C_water / c_s)
+            Q_wet = _effectiveness(UA / C_min, C_min / C_max) * C_min * (h_air_in - _h_saturated(T_water_in, P))
+            T_water_out = T_water_in + Q_wet / C_water
+        # dry coil
+        C_air = m_da * psy.cp_humid(W_air_in)
+        UA = 1.0 / (1.0 / UA_water + 1.0 / (UA_air * psy.cp_humid(W_air_in)))
+        C_min, C_max = np.minimum(C_air, C_water), np.maximum(C_air, C_water)
+        Q_dry = _effectiveness(UA / C_min, C_min / C_max) * C_min * (T_air_in - T_water_in)
+        # leaving air state from the bypass factor
+        BF = np.exp(-UA_air / m_da)
+        h_air_out = h_air_in - Q_wet / m_da
+        T_adp = _T_saturated(h_air_in - (h_air_in - h_air_out) / (1.0 - BF), P)
+        W_air_out = psy.W_saturated(T_adp, P) + BF * (W_air_in - psy.W_saturated(T_adp, P))
+        wet = (Q_wet > Q_dry) & (W_air_out < W_air_in)
+        Q = np.maximum(np.where(wet, Q_wet, Q_dry), 0.0)
+        W_air_out = np.where(wet, W_air_out, W_air_in)
+        T_air_out = np.where(
+            wet,
+            psy.Tdb_from_h(h_air_out, W_air_out),
+            T_air_in - Q / C_air
+        )
+        # with very humid entering air the mixing line runs above the
+        # saturation curve: the air leaves saturated with the same enthalpy
+        fog = wet & (W_air_out > psy.W_saturated(T_air_out, P))
+        if np.any(fog):
+            T_fog = _T_saturated(np.where(fog, h_air_out, 0.0), P)
+            T_air_out = np.where(fog, T_fog, T_air_out)
+            W_air_out = np.where(fog, psy.W_saturated(T_fog, P), W_air_out)
+        T_adp = np.where(wet, T_adp, (T_air_out - BF * T_air_in) / (1.0 - BF))
+        return {
+            'T_air_out': T_air_out,
+            'W_air_out': W_air_out,
+            'T_water_out': T_water_in + Q / C_water,
+            'Q': Q,
+            'Q_sen': m_da * (h_air_in - psy.enthalpy(T_air_out, W_air_in)),
+            'm_condensate': m_da * (W_air_in - W_air_out),
+            'T_adp': T_adp,
+            'BF': BF
+        }
@@ -0,0 +1,142 @@
+"""Economizer control of the outdoor air fraction, vectorized over time.
+
+In the notebooks the outdoor air flow rate is fixed by the ventilation
+requirement (`m_vent` from `V_vent`) and the mixed air state follows from
+`AdiabaticMixing`. An air handling unit with an economizer uses more outdoor
+air when that reduces the load of the cooling coil. `outdoor_air_fraction`
+determines the outdoor air fraction for every hour of a weather series at
+once, between the minimum fraction for ventilation and 100 %:
+
+- 'optimal': the fraction for which the cooling coil load plus the heating
+  needed to bring the mixed air to the coil leaving temperature is lowest;
+- 'dry_bulb': a differential dry-bulb economizer (100 % outdoor air when the
+  outdoor air is colder than the return air, modulated to keep the mixed air
+  at the coil leaving temperature);
+- 'enthalpy': the same, with the enthalpy of outdoor and return air being
+  compared.
+
+The enthalpy and humidity ratio of the mixed air are linear in the outdoor
+air fraction x (the mixing balance of `AdiabaticMixing`), and so is the
+cooling coil load on either side of the point where the coil starts to
+dehumidify. The coil and heating load is therefore a convex, piecewise
+linear function of x, whose minimum is at one of the ends of the range or
+where one of the linear pieces changes sign or takes over: the optimum is
+found by evaluating these few candidates, without iterating.
+
+All quantities are in SI units (see `batch.psychrometrics`). The enthalpy of
+the condensate leaving the cooling coil is neglected.
+"""
+from typing import Dict
+
+import numpy as np
+
+from . import psychrometrics as psy
+from .psychrometrics import ArrayLike
+
+
+CONTROLS = ('optimal', 'dry_bulb', 'enthalpy')
+
+
+def _loads(x, h_return, W_return, h_outdoor, W_outdoor, T_cooled, W_cooled_max):
+    """Cooling coil load and heating load per unit mass flow rate of air when
+    the outdoor air fraction is `x`."""
+    h_mixed = h_return + x * (h_outdoor - h_return)
+    W_mixed = W_return + x * (W_outdoor - W_return)
+    sensible = h_mixed - psy.enthalpy(T_cooled, W_mixed)
+    dehumidifying = h_mixed - psy.enthalpy(T_cooled, W_cooled_max)
+    q_cooling = np.maximum(np.maximum(sensible, dehumidifying), 0.0)
+    q_heating = np.maximum(-sensible, 0.0)
+    return q_cooling, q_heating
+
+
+def _modulated_fraction(T_return, T_outdoor, T_cooled, x_min):
+    """Outdoor air fraction that brings the mixed air to `T_cooled` (mixing
+    by dry-bulb temperature), limited to [x_min, 1]."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = (T_return - T_cooled) / (T_return - T_outdoor)
+    return np.clip(np.nan_to_num(x, nan=1.0, posinf=1.0, neginf=1.0), x_min, 1.0)
+
+
+def outdoor_air_fraction(
+    T_outdoor: ArrayLike,
+    W_outdoor: ArrayLike,
+    T_return: ArrayLike,
+    W_return: ArrayLike,
+    m_supply: ArrayLike,
+    m_vent_min: ArrayLike,
+    T_cooled: ArrayLike,
+    RH_cooled: float = 0.9,
+    control: str = 'optimal',
+    P: float = psy.P_ATM
+) -> Dict[str, np.ndarray]:
+    """Determine the outdoor air fraction of an air handling unit with an
+    economizer.
+
+    Params:
+    - T_outdoor, W_outdoor : ArrayLike
+        Outdoor air states (e.g. hourly weather data).
+    - T_return, W_return : ArrayLike
+        Return air states.
+    - m_supply : ArrayLike
+        Mass flow rates of supply air (kg/s).
+    - m_vent_min : ArrayLike
+        Minimum outdoor air flow rates for ventilation (kg/s).
+    - T_cooled : ArrayLike
+        Temperature of the air leaving the cooling coil (°C): the mixed air
+        is cooled or heated to this temperature.
+    - RH_cooled : float
+        Relative humidity of the air leaving the cooling coil when it
+        dehumidifies (fraction).
+    - control : str
+        'optimal', 'dry_bulb' or 'enthalpy', see the module documentation.
+
+    Returns a dict of arrays: the outdoor air fraction `x`, the outdoor air
+    flow rate `m_outdoor`, the mixed air state `T_mixed`, `W_mixed`, the
+    cooling coil load `Q_cooling_coil` and the heating load
+    `Q_heating_coil` to bring the mixed air to `T_cooled` (W).
+    """
+    if control not in CONTROLS:
+        raise ValueError(f"control must be one of {', '.join(CONTROLS)}, not '{control}'")
+    T_outdoor, W_outdoor, T_return, W_return, m_supply, m_vent_min, T_cooled = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (T_outdoor, W_outdoor, T_return, W_return, m_supply, m_vent_min, T_cooled))
+    )
+    x_min = np.clip(m_vent_min / m_supply, 0.0, 1.0)
+    h_outdoor = psy.enthalpy(T_outdoor, W_outdoor)
+    h_return = psy.enthalpy(T_return, W_return)
+    W_cooled_max = psy.W_from_RH(T_cooled, RH_cooled, P)
+    args = (h_return, W_return, h_outdoor, W_outdoor, T_cooled, W_cooled_max)
+    if control == 'optimal':
+        # the linear pieces of the load: a + b * x
+        dh, dW = h_outdoor - h_return, W_outdoor - W_return
+        h_g = psy.H_FG + psy.CP_V * T_cooled
+        a_sensible, b_sensible = h_return - psy.enthalpy(T_cooled, W_return), dh - dW * h_g
+        a_dehumidifying = h_return - psy.enthalpy(T_cooled, W_cooled_max)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            candidates = np.stack([
+                x_min,
+                np.ones_like(x_min),
+                -a_sensible / b_sensible,
+                -a_dehumidifying / dh,
+                (W_cooled_max - W_return) / dW
+            ])
+        candidates = np.clip(np.nan_to_num(candidates, nan=1.0, posinf=1.0, neginf=1.0), x_min, 1.0)
+        q_cooling, q_heating = _loads(candidates, *args)
+        # the first candidate wins a tie: no more outdoor air than needed
+        best = np.argmin(q_cooling + q_heating, axis=0)[np.newaxis]
+        x = np.take_along_axis(candidates, best, axis=0)[0]
+    else:
+        if control == 'dry_bulb':
+            use_outdoor_air = T_outdoor < T_return
+        else:
+            use_outdoor_air = h_outdoor < h_return
+        x = np.where(use_outdoor_air, _modulated_fraction(T_return, T_outdoor, T_cooled, x_min), x_min)
+    q_cooling, q_heating = _loads(x, *args)
+    T_mixed, W_mixed = psy.mix(x, T_outdoor, W_outdoor, 1.0 - x, T_return, W_return)
+    return {
+        'x': x,
+        'm_outdoor': x * m_supply,
+        'T_mixed': T_mixed,
+        'W_mixed': W_mixed,
+        'Q_cooling_coil': m_supply * q_cooling,
+        'Q_heating_coil': m_supply * q_heating
+    }
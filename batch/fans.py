@@ -0,0 +1,177 @@
+"""Supply fan at part load, vectorized over the operating points.
+
+`hvac.air_conditioning.Fan` takes the fan pressure and efficiency of one
+operating point. In a VAV system the air flow rate changes from hour to hour,
+and the fan pressure, efficiency and power change with it, depending on how
+the fan is controlled. `Fan` evaluates these for arrays of air flow rates:
+
+- 'vfd': the fan speed is varied. If the fan curve at design speed is given
+  (`FanCurve`), the operating point follows from the fan laws and the system
+  curve (the duct pressure drop plus the static pressure set point `dP_min`
+  that the VAV boxes need); otherwise the part-load power curve of a variable
+  speed drive is used.
+- 'inlet_vanes': the fan runs at constant speed and inlet vanes throttle the
+  flow (part-load power curve).
+- 'discharge_dampers': the fan runs at constant speed and a damper throttles
+  the flow. The operating point rides the fan curve, if given; otherwise the
+  part-load power curve is used.
+
+The part-load power curves give the fraction of design power as a cubic
+polynomial of the flow fraction; the coefficients are those of DOE-2.
+
+All quantities are in SI units (see `batch.psychrometrics`).
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from . import psychrometrics as psy
+from .psychrometrics import ArrayLike
+
+
+# coefficients c0..c3 of P / P_design = c0 + c1 * x + c2 * x**2 + c3 * x**3,
+# x = V / V_design
+PART_LOAD_CURVES = {
+    'vfd': (0.0015302446, 0.0052080574, 1.1086242, -0.11635563),
+    'inlet_vanes': (0.35071223, 0.30850535, -0.54137364, 0.87198823),
+    'discharge_dampers': (0.37073425, 0.97250253, -0.34240761, 0.0)
+}
+
+
+class FanCurve:
+    """Fan pressure and fan efficiency as a function of the volume flow rate,
+    at design speed (e.g. read from the catalogue of the fan manufacturer).
+    Values between the given points are interpolated linearly.
+
+    Params:
+    - V : ArrayLike
+        Volume flow rates (m³/s), in increasing order.
+    - dP : ArrayLike
+        Fan pressures at these flow rates (Pa), decreasing.
+    - eta : ArrayLike
+        Fan efficiencies at these flow rates (fraction).
+    """
+    def __init__(self, V: ArrayLike, dP: ArrayLike, eta: ArrayLike):
+        self.V = np.asarray(V, dtype=float)
+        self.dP = np.asarray(dP, dtype=float)
+        self.eta = np.asarray(eta, dtype=float)
+        if np.any(np.diff(self.V) <= 0.0) or np.any(np.diff(self.dP) >= 0.0):
+            raise ValueError('the fan curve must have increasing flow rates and decreasing pressures')
+
+    def pressure(self, V: ArrayLike) -> np.ndarray:
+        return np.interp(V, self.V, self.dP)
+
+    def efficiency(self, V: ArrayLike) -> np.ndarray:
+        return np.interp(V, self.V, self.eta)
+
+
+class Fan:
+    """A supply fan with its control.
+
+    Params:
+    - V_design : float
+        Design volume flow rate (m³/s).
+    - dP_design : float
+        Fan pressure at design flow rate (Pa).
+    - fan_efficiency : float, optional
+        Fan efficiency at design flow rate (fraction). Not used (and may be
+        None) if a fan curve is given: the efficiency is then taken from the
+        curve.
+    - motor_efficiency : float
+        Efficiency of the motor (and drive), taken constant.
+    - control : str
+        'vfd', 'inlet_vanes' or 'discharge_dampers', see the module
+        documentation.
+    - curve : FanCurve, optional
+        Fan curve at design speed.
+    - dP_min : float
+        Static pressure set point (Pa): the part of the system pressure drop
+        that does not change with the flow rate. Only used for 'vfd' with a
+        fan curve.
+    - motor_in_airstream : bool
+        If True, the heat of the motor losses is also picked up by the air,
+        otherwise only the fan power.
+    """
+    def __init__(
+        self,
+        V_design: float,
+        dP_design: float,
+        fan_efficiency: Optional[float],
+        motor_efficiency: float = 1.0,
+        control: str = 'vfd',
+        curve: Optional[FanCurve] = None,
+        dP_min: float = 0.0,
+        motor_in_airstream: bool = True
+    ):
+        if control not in PART_LOAD_CURVES:
+            raise ValueError(f"control must be one of {', '.join(PART_LOAD_CURVES)}, not '{control}'")
+        self.V_design = V_design
+        self.dP_design = dP_design
+        self.fan_efficiency = fan_efficiency if curve is None else float(curve.efficiency(V_design))
+        self.motor_efficiency = motor_efficiency
+        self.control = control
+        self.curve = curve
+        self.dP_min = dP_min
+        self.motor_in_airstream = motor_in_airstream
+
+    @property
+    def W_design(self) -> float:
+        """Fan shaft power at design flow rate (W)."""
+        return self.V_design * self.dP_design / self.fan_efficiency
+
+    def _operating_point(self, V: np.ndarray):
+        """Return the fan pressure and the shaft power at flow rates `V`."""
+        if self.curve is not None and self.control == 'vfd':
+            # With the fan laws, the fan at speed ratio n delivers V at the
+            # pressure n² * dP_curve(V / n) with efficiency eta_curve(V / n).
+            # The operating point is on the system curve, so with u = V / n:
+            # dP_curve(u) / u² = dP_system(V) / V², which is solved for u by
+            # interpolation (the left-hand side decreases with u).
+            dP = self.dP_min + (self.dP_design - self.dP_min) * (V / self.V_design) ** 2
+            with np.errstate(divide='ignore', invalid='ignore'):
+                g = dP / V ** 2
+            V_curve, dP_curve = self.curve.V[self.curve.V > 0.0], self.curve.dP[self.curve.V > 0.0]
+            u = np.interp(-g, -dP_curve / V_curve ** 2, V_curve)
+            return dP, np.where(V > 0.0, V * dP / self.curve.efficiency(u), 0.0)
+        if self.curve is not None and self.control == 'discharge_dampers':
+            dP = self.curve.pressure(V)
+            # the efficiency of a catalogue curve is zero at shut-off
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return dP, np.where(V > 0.0, V * dP / self.curve.efficiency(V), 0.0)
+        c0, c1, c2, c3 = PART_LOAD_CURVES[self.control]
+        x = V / self.V_design
+        W_shaft = self.W_design * (c0 + x * (c1 + x * (c2 + x * c3)))
+        return np.full_like(V, np.nan), W_shaft
+
+    def part_load(
+        self,
+        m_da: ArrayLike,
+        T_out: ArrayLike,
+        W: ArrayLike,
+        P: ArrayLike = psy.P_ATM
+    ) -> Dict[str, np.ndarray]:
+        """Evaluate the fan for arrays of air mass flow rates.
+
+        Params:
+        - m_da : ArrayLike
+            Mass flow rates of dry air through the fan (kg/s).
+        - T_out, W : ArrayLike
+            State of the air leaving the fan (the supply air).
+
+        Returns a dict of arrays:
+        - 'V': volume flow rate at the fan outlet (m³/s),
+        - 'dP': fan pressure (Pa; NaN if it follows from a part-load power
+          curve),
+        - 'W_fan': electrical power (W),
+        - 'dT': temperature rise of the air through the fan (K),
+        - 'T_in': temperature of the air entering the fan (°C), i.e. the
+          counterpart of `Fan.air_in`.
+        """
+        m_da = np.asarray(m_da, dtype=float)
+        V = m_da * psy.specific_volume(T_out, W, P)
+        dP, W_shaft = self._operating_point(V)
+        W_fan = W_shaft / self.motor_efficiency
+        Q_air = W_fan if self.motor_in_airstream else W_shaft
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dT = np.where(m_da > 0.0, Q_air / (m_da * psy.cp_humid(W)), 0.0)
+        return {'V': V, 'dP': dP, 'W_fan': W_fan, 'dT': dT, 'T_in': T_out - dT}
@@ -0,0 +1,515 @@
+"""Air handling units declared as a network of units and air streams.
+
+In `airco_proc_02` an air handling unit with ventilation and a return air
+bypass is solved by hand, one balance at a time, in an order that must be
+worked out first. With `Network` the units and the air streams between them
+are declared, together with what is known about the streams, and all mass,
+moisture and energy balances are solved at once::
+
+    ahu = Network()
+    ahu.stream('outdoor', m=0.26, T=34.0, RH=0.5)
+    ahu.stream('coil_out', T=6.0, RH=1.0)
+    ahu.stream('supply', m=1.2)
+    ahu.stream('return', T=26.0)
+    ahu.mixer('mixing', inlets=['outdoor', 'recirculation'], outlet='coil_in')
+    ahu.coil('cooling_coil', inlet='coil_in', outlet='coil_out')
+    ahu.mixer('bypass_mixing', inlets=['coil_out', 'bypass'], outlet='supply')
+    ahu.zone('space', inlet='supply', outlet='return', Q_sen=14.0e3, Q_lat=9.0e3)
+    ahu.splitter('bypass_damper', inlet='return', outlets=['bypass', 'return_fan'])
+    ahu.splitter('exhaust_damper', inlet='return_fan', outlets=['recirculation', 'exhaust'])
+    results = ahu.solve()
+    results['Q_cooling_coil'], results['m_bypass']
+
+Streams that are only named in a unit need not be declared. Each air stream
+has three unknowns, its mass flow rate of dry air `m`, its temperature `T`
+and its humidity ratio `W`; units with an unknown heat flow (a coil whose
+leaving state is given) add it as a fourth kind of unknown. Every unit adds
+its balances as equations, and every known value of a stream (`m`, `T`, `W`,
+`RH` or `h`) or fraction of a splitter one equation more. There must be as
+many equations as unknowns; recycle loops, like the return air bypass above,
+need no special treatment.
+
+The equations are solved with Newton's method. The Jacobian is found by
+finite differences, but a perturbed unknown only re-evaluates the equations
+of the units it takes part in: an air handling unit with a dozen zones (some
+150 unknowns) is solved in tens of milliseconds. With SciPy installed, the
+Newton steps are sparse linear solves.
+
+The balances of a zone are those of `batch.space`; the heat carried off by
+the condensate of a coil is included in the coil load. All quantities are in
+SI units (see `batch.psychrometrics`).
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import psychrometrics as psy
+
+
+# scale factors that bring the residuals of the equations to the same order
+# of magnitude: mass in kg/s, moisture in g/s, energy in kW
+_MOISTURE = 1.0e3
+_ENERGY = 1.0e-3
+
+# units of the stream results returned by `Network.solve`, per prefix
+STREAM_UNITS = {
+    'm': 'kg / s',
+    'T': 'degC',
+    'W': 'kg / kg',
+    'RH': 'frac',
+    'h': 'J / kg'
+}
+
+
+class _Unit:
+    """A unit of the network: its streams, its unknown heat flows and its
+    equations."""
+    n_unknowns = 0
+
+    def __init__(self, name: str, inlets: Sequence[str], outlets: Sequence[str]):
+        self.name = name
+        self.inlets = list(inlets)
+        self.outlets = list(outlets)
+
+    @property
+    def streams(self) -> List[str]:
+        return self.inlets + self.outlets
+
+    def residuals(self, states: Dict[str, np.ndarray], unknowns: np.ndarray, P: float) -> List[float]:
+        raise NotImplementedError
+
+    def results(self, states: Dict[str, np.ndarray], unknowns: np.ndarray, P: float) -> Dict[str, float]:
+        return {}
+
+    def result_units(self) -> Dict[str, str]:
+        return {}
+
+
+class _Mixer(_Unit):
+    def residuals(self, states, unknowns, P):
+        m, T, W = states[self.outlets[0]]
+        mass, moisture, energy = -m, -m * W, -m * psy.enthalpy(T, W)
+        for name in self.inlets:
+            m, T, W = states[name]
+            mass += m
+            moisture += m * W
+            energy += m * psy.enthalpy(T, W)
+        return [mass, _MOISTURE * moisture, _ENERGY * energy]
+
+
+class _Splitter(_Unit):
+    def __init__(self, name, inlets, outlets, fractions: Dict[str, float]):
+        super().__init__(name, inlets, outlets)
+        self.fractions = fractions
+
+    def residuals(self, states, unknowns, P):
+        m_in, T_in, W_in = states[self.inlets[0]]
+        res = [m_in - sum(states[name][0] for name in self.outlets)]
+        for name in self.outlets:
+            m, T, W = states[name]
+            res += [T - T_in, _MOISTURE * (W - W_in)]
+        for name, fraction in self.fractions.items():
+            res.append(states[name][0] - fraction * m_in)
+        return res
+
+
+class _Coil(_Unit):
+    def __init__(self, name, inlets, outlets, Q: Optional[float], sensible: bool):
+        super().__init__(name, inlets, outlets)
+        self.Q = Q
+        self.sensible = sensible
+        self.n_unknowns = 1 if Q is None else 0
+
+    def _Q(self, unknowns):
+        return unknowns[0] if self.Q is None else self.Q
+
+    def residuals(self, states, unknowns, P):
+        (m_in, T_in, W_in), (m_out, T_out, W_out) = states[self.inlets[0]], states[self.outlets[0]]
+        m_condensate = m_in * W_in - m_out * W_out
+        energy = (
+            m_in * psy.enthalpy(T_in, W_in) + self._Q(unknowns)
+            - m_out * psy.enthalpy(T_out, W_out) - m_condensate * psy.CP_W * T_out
+        )
+        res = [m_in - m_out, _ENERGY * energy]
+        if self.sensible:
+            res.append(_MOISTURE * (W_out - W_in))
+        return res
+
+    def results(self, states, unknowns, P):
+        (m_in, T_in, W_in), (m_out, T_out, W_out) = states[self.inlets[0]], states[self.outlets[0]]
+        return {
+            f'Q_{self.name}': self._Q(unknowns),
+            f'm_condensate_{self.name}': m_in * W_in - m_out * W_out
+        }
+
+    def result_units(self):
+        return {f'Q_{self.name}': 'W', f'm_condensate_{self.name}': 'kg / s'}
+
+
+class _CoolingCoil(_Unit):
+    def __init__(self, name, inlets, outlets, model, T_water_in: float, m_water: Optional[float]):
+        super().__init__(name, inlets, outlets)
+        self.model = model
+        self.T_water_in = T_water_in
+        self.m_water = m_water
+
+    def _rate(self, states, P):
+        m, T, W = states[self.inlets[0]]
+        return self.model.rate(m, T, W, self.T_water_in, self.m_water, P)
+
+    def residuals(self, states, unknowns, P):
+        rating = self._rate(states, P)
+        m_in = states[self.inlets[0]][0]
+        m_out, T_out, W_out = states[self.outlets[0]]
+        return [m_in - m_out, T_out - float(rating['T_air_out']), _MOISTURE * (W_out - float(rating['W_air_out']))]
+
+    def results(self, states, unknowns, P):
+        rating = self._rate(states, P)
+        return {
+            f'Q_{self.name}': -rating['Q'],
+            f'm_condensate_{self.name}': rating['m_condensate'],
+            f'T_water_out_{self.name}': rating['T_water_out']
+        }
+
+    def result_units(self):
+        return {f'Q_{self.name}': 'W', f'm_condensate_{self.name}': 'kg / s', f'T_water_out_{self.name}': 'degC'}
+
+
+class _Fan(_Unit):
+    def __init__(self, name, inlets, outlets, model, W_fan: float):
+        super().__init__(name, inlets, outlets)
+        self.model = model
+        self.W_fan = W_fan
+
+    def _part_load(self, states, P):
+        m, T, W = states[self.outlets[0]]
+        return self.model.part_load(m, T, W, P)
+
+    def residuals(self, states, unknowns, P):
+        (m_in, T_in, W_in), (m_out, T_out, W_out) = states[self.inlets[0]], states[self.outlets[0]]
+        if self.model is not None:
+            dT = float(self._part_load(states, P)['dT'])
+        else:
+            dT = self.W_fan / (m_out * psy.cp_humid(W_out)) if m_out > 0.0 else 0.0
+        return [m_in - m_out, T_out - T_in - dT, _MOISTURE * (W_out - W_in)]
+
+    def results(self, states, unknowns, P):
+        if self.model is None:
+            return {f'W_fan_{self.name}': self.W_fan}
+        return {f'W_fan_{self.name}': self._part_load(states, P)['W_fan']}
+
+    def result_units(self):
+        return {f'W_fan_{self.name}': 'W'}
+
+
+class _Zone(_Unit):
+    def __init__(self, name, inlets, outlets, Q_sen: float, Q_lat: float):
+        super().__init__(name, inlets, outlets)
+        self.Q_sen = Q_sen
+        self.Q_lat = Q_lat
+
+    def residuals(self, states, unknowns, P):
+        (m_in, T_in, W_in), (m_out, T_out, W_out) = states[self.inlets[0]], states[self.outlets[0]]
+        h_g = psy.H_FG + psy.CP_V * T_out
+        return [
+            m_in - m_out,
+            _ENERGY * (m_in * psy.cp_humid(W_in) * (T_out - T_in) - self.Q_sen),
+            _ENERGY * (m_in * (W_out - W_in) * h_g - self.Q_lat)
+        ]
+
+
+class _Specification(_Unit):
+    """The known values of a stream."""
+    def __init__(self, name: str, values: Dict[str, float]):
+        super().__init__(name, [], [name])
+        self.values = values
+
+    def residuals(self, states, unknowns, P):
+        m, T, W = states[self.name]
+        res = []
+        for key, value in self.values.items():
+            if key == 'm':
+                res.append(m - value)
+            elif key == 'T':
+                res.append(T - value)
+            elif key == 'W':
+                res.append(_MOISTURE * (W - value))
+            elif key == 'RH':
+                res.append(psy.RH_from_W(T, W, P) - value)
+            else:
+                res.append(_ENERGY * (psy.enthalpy(T, W) - value))
+        return res
+
+
+class Network:
+    """An air handling unit as a network of units and air streams.
+
+    Params:
+    - P : float
+        Atmospheric pressure (Pa).
+    """
+    def __init__(self, P: float = psy.P_ATM):
+        self.P = P
+        self.units: List[_Unit] = []
+        self.specifications: Dict[str, Dict[str, float]] = {}
+
+    def stream(
+        self,
+        name: str,
+        m: Optional[float] = None,
+        T: Optional[float] = None,
+        W: Optional[float] = None,
+        RH: Optional[float] = None,
+        h: Optional[float] = None
+    ) -> 'Network':
+        """Declare the known values of stream `name`: its mass flow rate of
+        dry air `m` (kg/s), and at most two of its temperature `T`, humidity
+        ratio `W`, relative humidity `RH` (fraction) and enthalpy `h` (J/kg).
+        A stream that enters the network (e.g. outdoor air) needs all three.
+        """
+        values = {k: v for k, v in dict(m=m, T=T, W=W, RH=RH, h=h).items() if v is not None}
+        if len(values) - ('m' in values) > 2:
+            raise ValueError(f"stream '{name}': at most two of T, W, RH and h can be given")
+        self.specifications.setdefault(name, {}).update(values)
+        return self
+
+    def _add(self, unit: _Unit) -> 'Network':
+        if any(u.name == unit.name for u in self.units):
+            raise ValueError(f"there is already a unit named '{unit.name}'")
+        for name in unit.inlets:
+            if any(name in u.inlets for u in self.units):
+                raise ValueError(f"stream '{name}' already enters another unit")
+        for name in unit.outlets:
+            if any(name in u.outlets for u in self.units):
+                raise ValueError(f"stream '{name}' already leaves another unit")
+        self.units.append(unit)
+        return self
+
+    def mixer(self, name: str, inlets: Sequence[str], outlet: str) -> 'Network':
+        """Add an adiabatic mixing box that mixes the streams `inlets` into
+        stream `outlet`."""
+        return self._add(_Mixer(name, inlets, [outlet]))
+
+    def splitter(
+        self,
+        name: str,
+        inlet: str,
+        outlets: Sequence[str],
+        fractions: Optional[Dict[str, float]] = None
+    ) -> 'Network':
+        """Add a split of stream `inlet` into the streams `outlets`, which
+        have the state of the inlet: a bypass, or the exhaust and
+        recirculation dampers. `fractions` optionally fixes the mass flow
+        rate of outlets as a fraction of the inlet's."""
+        fractions = fractions or {}
+        unknown = set(fractions) - set(outlets)
+        if unknown:
+            raise ValueError(f"splitter '{name}': {', '.join(sorted(unknown))} are not outlets")
+        return self._add(_Splitter(name, [inlet], outlets, fractions))
+
+    def coil(
+        self,
+        name: str,
+        inlet: str,
+        outlet: str,
+        Q: Optional[float] = None,
+        sensible: bool = False
+    ) -> 'Network':
+        """Add a coil that adds heat `Q` (W; negative for cooling) to the
+        air. If `Q` is None it is an unknown, which the known values of the
+        leaving air determine. If `sensible` is True, the humidity ratio of
+        the air does not change (a heating coil or a dry cooling coil);
+        otherwise the leaving state must be known, as for a cooling coil of
+        which the leaving air state is chosen."""
+        return self._add(_Coil(name, [inlet], [outlet], Q, sensible))
+
+    def cooling_coil(
+        self,
+        name: str,
+        inlet: str,
+        outlet: str,
+        model,
+        T_water_in: float,
+        m_water: Optional[float] = None
+    ) -> 'Network':
+        """Add a chilled water coil whose leaving air state follows from its
+        rating, `model` being a `batch.coils.CoolingCoil`, at entering water
+        temperature `T_water_in` (°C) and water flow rate `m_water` (kg/s;
+        the design flow rate if omitted)."""
+        return self._add(_CoolingCoil(name, [inlet], [outlet], model, T_water_in, m_water))
+
+    def fan(self, name: str, inlet: str, outlet: str, model=None, W_fan: float = 0.0) -> 'Network':
+        """Add a fan that heats the air by its power: that of `model`, a
+        `batch.fans.Fan`, at the flow rate through it, or else the constant
+        power `W_fan` (W)."""
+        return self._add(_Fan(name, [inlet], [outlet], model, W_fan))
+
+    def zone(self, name: str, inlet: str, outlet: str, Q_sen: float, Q_lat: float = 0.0) -> 'Network':
+        """Add a zone with sensible and latent heat gains `Q_sen` and
+        `Q_lat` (W); stream `outlet` is the air leaving the zone, at the state
+        of the zone air."""
+        return self._add(_Zone(name, [inlet], [outlet], Q_sen, Q_lat))
+
+    def _blocks(self) -> Tuple[List[str], List[_Unit]]:
+        streams = []
+        for unit in self.units:
+            for name in unit.streams:
+                if name not in streams:
+                    streams.append(name)
+        unknown = set(self.specifications) - set(streams)
+        if unknown:
+            raise ValueError(f"streams {', '.join(sorted(unknown))} are not connected to any unit")
+        blocks = self.units + [
+            _Specification(name, self.specifications[name])
+            for name in streams if self.specifications.get(name)
+        ]
+        return streams, blocks
+
+    def _initial_guess(self, streams: List[str], n: int) -> np.ndarray:
+        x = np.zeros(n)
+        for i, name in enumerate(streams):
+            values = self.specifications.get(name, {})
+            T = values.get('T', 20.0)
+            if 'W' in values:
+                W = values['W']
+            elif 'RH' in values:
+                W = float(psy.W_from_RH(T, values['RH'], self.P))
+            else:
+                W = 0.008
+            x[3 * i:3 * i + 3] = values.get('m', 1.0), T, W
+        return x
+
+    def solve(self, tol: float = 1.0e-9, max_iter: int = 50) -> Dict[str, float]:
+        """Solve the balances of the network.
+
+        Params:
+        - tol : float
+            Tolerance on the largest residual (kg/s, g/s, kW, K).
+        - max_iter : int
+            Maximum number of Newton iterations.
+
+        Returns a dict of floats: per stream its mass flow rate `m_<stream>`,
+        temperature `T_<stream>`, humidity ratio `W_<stream>`, relative
+        humidity `RH_<stream>` and enthalpy `h_<stream>`, and per unit its
+        heat flow `Q_<unit>` (coils), condensate flow rate
+        `m_condensate_<unit>` (coils) and power `W_fan_<unit>` (fans). Their
+        units are given by `result_units`.
+
+        Raises a ValueError if the number of equations differs from the
+        number of unknowns or the equations do not determine the unknowns,
+        and a RuntimeError if Newton's method does not converge.
+        """
+        streams, blocks = self._blocks()
+        n_streams = 3 * len(streams)
+        n = n_streams + sum(b.n_unknowns for b in blocks)
+        x = self._initial_guess(streams, n)
+        stream_index = {name: i for i, name in enumerate(streams)}
+
+        # position of the unknowns and the equations of every block, and the
+        # blocks every unknown takes part in
+        columns, rows, depends = [], [], [[] for _ in range(n)]
+        offset_x, offset_r = n_streams, 0
+        for k, block in enumerate(blocks):
+            columns.append(slice(offset_x, offset_x + block.n_unknowns))
+            offset_x += block.n_unknowns
+            n_rows = len(block.residuals(self._states(x, stream_index), x[columns[k]], self.P))
+            rows.append(slice(offset_r, offset_r + n_rows))
+            offset_r += n_rows
+            for name in block.streams:
+                i = 3 * stream_index[name]
+                for j in range(i, i + 3):
+                    if k not in depends[j]:
+                        depends[j].append(k)
+            for j in range(columns[k].start, columns[k].stop):
+                depends[j].append(k)
+        if offset_r != n:
+            raise ValueError(f'the network has {offset_r} equations for {n} unknowns')
+
+        def residuals(x):
+            states = self._states(x, stream_index)
+            r = np.empty(n)
+            for k, block in enumerate(blocks):
+                r[rows[k]] = block.residuals(states, x[columns[k]], self.P)
+            return r
+
+        r = residuals(x)
+        for _ in range(max_iter):
+            if np.max(np.abs(r)) < tol:
+                break
+            J = []  # (row, column, value)
+            states = self._states(x, stream_index)
+            for j in range(n):
+                dx = 1.0e-7 * max(abs(x[j]), 1.0e-2)
+                x_j = x[j]
+                x[j] = x_j + dx
+                states_j = self._states(x, stream_index)
+                for k in depends[j]:
+                    r_k = np.asarray(blocks[k].residuals(states_j, x[columns[k]], self.P))
+                    for i, value in enumerate((r_k - r[rows[k]]) / dx, start=rows[k].start):
+                        if value != 0.0:
+                            J.append((i, j, value))
+                x[j] = x_j
+            step = _linear_solve(J, -r, n)
+            # halve the step until the residuals decrease
+            norm = np.linalg.norm(r)
+            for _ in range(30):
+                r_new = residuals(x + step)
+                if np.all(np.isfinite(r_new)) and np.linalg.norm(r_new) < norm:
+                    break
+                step = step / 2.0
+            x, r = x + step, r_new
+        else:
+            raise RuntimeError(f'the network did not converge in {max_iter} iterations')
+
+        states = self._states(x, stream_index)
+        results = {}
+        for name in streams:
+            m, T, W = (float(v) for v in states[name])
+            results.update({
+                f'm_{name}': m,
+                f'T_{name}': T,
+                f'W_{name}': W,
+                f'RH_{name}': float(psy.RH_from_W(T, W, self.P)),
+                f'h_{name}': float(psy.enthalpy(T, W))
+            })
+        for k, block in enumerate(blocks):
+            results.update({key: float(value) for key, value in block.results(states, x[columns[k]], self.P).items()})
+        return results
+
+    @staticmethod
+    def _states(x: np.ndarray, stream_index: Dict[str, int]) -> Dict[str, np.ndarray]:
+        return {name: x[3 * i:3 * i + 3] for name, i in stream_index.items()}
+
+    def result_units(self) -> Dict[str, str]:
+        """Return the units of the results of `solve` (see
+        `batch.records`)."""
+        streams, _ = self._blocks()
+        units = {f'{prefix}_{name}': u for name in streams for prefix, u in STREAM_UNITS.items()}
+        for unit in self.units:
+            units.update(unit.result_units())
+        return units
+
+
+def _linear_solve(J: List[Tuple[int, int, float]], b: np.ndarray, n: int) -> np.ndarray:
+    """Solve J x = b, J given as (row, column, value) triplets; sparse if
+    SciPy is installed."""
+    i, j, values = np.array(J).T
+    i, j = i.astype(int), j.astype(int)
+    try:
+        from scipy.sparse import csc_matrix
+        from scipy.sparse.linalg import MatrixRankWarning, spsolve
+    except ImportError:
+        A = np.zeros((n, n))
+        A[i, j] = values
+        try:
+            return np.linalg.solve(A, b)
+        except np.linalg.LinAlgError:
+            raise ValueError('the equations of the network do not determine all unknowns') from None
+    import warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', MatrixRankWarning)
+        try:
+            x = spsolve(csc_matrix((values, (i, j)), shape=(n, n)), b)
+        except MatrixRankWarning:
+            raise ValueError('the equations of the network do not determine all unknowns') from None
+    return x
@@ -0,0 +1,153 @@
+"""Vectorized psychrometric relations of humid air.
+
+The functions take and return NumPy arrays (or floats) in SI units, with
+temperatures in °C:
+- Tdb, Twb, Tdp : °C
+- W : kg_H2O/kg_da
+- RH : fraction (0..1)
+- h : J/kg_da
+- v : m³/kg_da
+- P : Pa
+
+The equations are the ideal-gas relations of ASHRAE Fundamentals (2017),
+Chapter 1. `hvac.fluids.HumidAir` uses CoolProp's real-gas model instead; in
+the range of air conditioning applications the results differ by less than
+0.5 %.
+"""
+from typing import Union
+
+import numpy as np
+
+
+ArrayLike = Union[float, np.ndarray]
+
+P_ATM = 101_325.0  # Pa
+T_ZERO = 273.15  # K
+R_DA = 287.042  # J/(kg.K), gas constant of dry air
+MW_RATIO = 0.621945  # ratio of the molar masses of water vapor and dry air
+CP_DA = 1006.0  # J/(kg.K), specific heat of dry air
+CP_V = 1860.0  # J/(kg.K), specific heat of water vapor
+CP_W = 4186.0  # J/(kg.K), specific heat of liquid water
+H_FG = 2501.0e3  # J/kg, heat of vaporization of water at 0 °C
+
+
+def saturation_pressure(T: ArrayLike) -> ArrayLike:
+    """Saturation pressure of water vapor (Pa) over liquid water (T >= 0 °C)
+    or ice (T < 0 °C), at temperature `T` (°C)."""
+    T_abs = np.asarray(T, dtype=float) + T_ZERO
+    ln_p_ice = (
+        -5.6745359e3 / T_abs + 6.3925247 - 9.6778430e-3 * T_abs + 6.2215701e-7 * T_abs ** 2
+        + 2.0747825e-9 * T_abs ** 3 - 9.4840240e-13 * T_abs ** 4 + 4.1635019 * np.log(T_abs)
+    )
+    ln_p_water = (
+        -5.8002206e3 / T_abs + 1.3914993 - 4.8640239e-2 * T_abs + 4.1764768e-5 * T_abs ** 2
+        - 1.4452093e-8 * T_abs ** 3 + 6.5459673 * np.log(T_abs)
+    )
+    return np.exp(np.where(T_abs >= T_ZERO, ln_p_water, ln_p_ice))
+
+
+def W_from_pw(p_w: ArrayLike, P: ArrayLike = P_ATM) -> ArrayLike:
+    """Humidity ratio from the partial pressure of water vapor."""
+    return MW_RATIO * p_w / (P - p_w)
+
+
+def pw_from_W(W: ArrayLike, P: ArrayLike = P_ATM) -> ArrayLike:
+    """Partial pressure of water vapor from the humidity ratio."""
+    return P * W / (MW_RATIO + W)
+
+
+def W_from_RH(Tdb: ArrayLike, RH: ArrayLike, P: ArrayLike = P_ATM) -> ArrayLike:
+    """Humidity ratio from dry-bulb temperature and relative humidity."""
+    return W_from_pw(RH * saturation_pressure(Tdb), P)
+
+
+def W_saturated(T: ArrayLike, P: ArrayLike = P_ATM) -> ArrayLike:
+    """Humidity ratio of saturated air at temperature `T`."""
+    return W_from_pw(saturation_pressure(T), P)
+
+
+def W_from_Twb(Tdb: ArrayLike, Twb: ArrayLike, P: ArrayLike = P_ATM) -> ArrayLike:
+    """Humidity ratio from dry-bulb and thermodynamic wet-bulb temperature."""
+    Tdb = np.asarray(Tdb, dtype=float)
+    Twb = np.asarray(Twb, dtype=float)
+    W_s = W_saturated(Twb, P)
+    W_water = ((H_FG - (CP_W - CP_V) * Twb) * W_s - CP_DA * (Tdb - Twb)) / (H_FG + CP_V * Tdb - CP_W * Twb)
+    # below freezing, the wet bulb is covered with ice (ASHRAE eq. 37)
+    W_ice = ((2830.0e3 - 0.24e3 * Twb) * W_s - CP_DA * (Tdb - Twb)) / (2830.0e3 + CP_V * Tdb - 2.1e3 * Twb)
+    return np.where(Twb >= 0.0, W_water, W_ice)
+
+
+def RH_from_W(Tdb: ArrayLike, W: ArrayLike, P: ArrayLike = P_ATM) -> ArrayLike:
+    """Relative humidity (fraction) from dry-bulb temperature and humidity
+    ratio."""
+    return pw_from_W(W, P) / saturation_pressure(Tdb)
+
+
+def enthalpy(Tdb: ArrayLike, W: ArrayLike) -> ArrayLike:
+    """Specific enthalpy of humid air (J/kg_da)."""
+    return CP_DA * Tdb + W * (H_FG + CP_V * Tdb)
+
+
+def Tdb_from_h(h: ArrayLike, W: ArrayLike) -> ArrayLike:
+    """Dry-bulb temperature from specific enthalpy and humidity ratio."""
+    return (h - H_FG * W) / (CP_DA + CP_V * W)
+
+
+def cp_humid(W: ArrayLike) -> ArrayLike:
+    """Specific heat of humid air per unit mass of dry air (J/(kg_da.K))."""
+    return CP_DA + CP_V * W
+
+
+def specific_volume(Tdb: ArrayLike, W: ArrayLike, P: ArrayLike = P_ATM) -> ArrayLike:
+    """Specific volume of humid air per unit mass of dry air (m³/kg_da)."""
+    return R_DA * (Tdb + T_ZERO) * (1.0 + W / MW_RATIO) / P
+
+
+def density(Tdb: ArrayLike, W: ArrayLike, P: ArrayLike = P_ATM) -> ArrayLike:
+    """Mass of dry air per unit volume of humid air (kg_da/m³), i.e. the
+    factor that converts a volume flow rate into a dry-air mass flow rate."""
+    return 1.0 / specific_volume(Tdb, W, P)
+
+
+def dew_point(W: ArrayLike, P: ArrayLike = P_ATM, tol: float = 1.0e-9) -> ArrayLike:
+    """Dew-point temperature from humidity ratio (Newton iteration on the
+    saturation pressure curve)."""
+    p_w = np.maximum(pw_from_W(np.asarray(W, dtype=float), P), 1.0e-3)
+    ln_p_w = np.log(p_w)
+    # initial guess from ASHRAE eq. 39 (valid between 0 and 93 °C)
+    alpha = ln_p_w - np.log(1000.0)
+    T = 6.54 + 14.526 * alpha + 0.7389 * alpha ** 2 + 0.09486 * alpha ** 3 + 0.4569 * (p_w / 1000.0) ** 0.1984
+    for _ in range(50):
+        f = np.log(saturation_pressure(T)) - ln_p_w
+        dT = 1.0e-4
+        df = (np.log(saturation_pressure(T + dT)) - np.log(saturation_pressure(T - dT))) / (2.0 * dT)
+        step = f / df
+        T = T - step
+        if np.all(np.abs(step) < tol):
+            break
+    return T
+
+
+def wet_bulb(Tdb: ArrayLike, W: ArrayLike, P: ArrayLike = P_ATM, tol: float = 1.0e-9) -> ArrayLike:
+    """Thermodynamic wet-bulb temperature from dry-bulb temperature and
+    humidity ratio (vectorized bisection between dew point and dry bulb)."""
+    Tdb, W = np.broadcast_arrays(np.asarray(Tdb, dtype=float), np.asarray(W, dtype=float))
+    lo = np.minimum(dew_point(W, P), Tdb) - 1.0e-6
+    hi = Tdb.copy()
+    while np.any(hi - lo > tol):
+        mid = 0.5 * (lo + hi)
+        # W_from_Twb decreases when Twb decreases
+        too_high = W_from_Twb(Tdb, mid, P) > W
+        hi = np.where(too_high, mid, hi)
+        lo = np.where(too_high, lo, mid)
+    return 0.5 * (lo + hi)
+
+
+def mix(m1: ArrayLike, Tdb1: ArrayLike, W1: ArrayLike, m2: ArrayLike, Tdb2: ArrayLike, W2: ArrayLike):
+    """Adiabatic mixing of two air streams with dry-air mass flow rates `m1`
+    and `m2`. Returns the dry-bulb temperature and humidity ratio of the
+    mixed stream (the closed-form counterpart of `AdiabaticMixing`)."""
+    m = m1 + m2
+    W = (m1 * W1 + m2 * W2) / m
+    h = (m1 * enthalpy(Tdb1, W1) + m2 * enthalpy(Tdb2, W2)) / m
+    return Tdb_from_h(h, W), W
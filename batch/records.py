@@ -0,0 +1,112 @@
+"""Results of many runs as one table.
+
+The design and part-load methods return a dict per run, with pint quantities
+(`VAVSystem`) or floats and arrays in SI units (`batch.vav`). `to_record`
+turns such a dict into a NumPy structured array with one row, whose field
+names carry the units, e.g. `'Q_cooling_coil [Btu / hr]'`. Records of runs
+with the same kind of results have the same dtype, so they can be
+concatenated and written to a file without formatting values one by one::
+
+    records = [to_record(vav.part_load_summer(...), vav.RESULT_UNITS, T_outdoor=T) for T in T_outdoors]
+    frame = to_frame(records)
+    frame.to_parquet('part_load.parquet')
+
+Zone results (arrays with one element per zone) are left out of `to_record`;
+`to_zone_records` returns them as a table with one row per zone.
+"""
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from .units import convert
+
+
+def _field(key: str, value: Any, units: Dict[str, str]):
+    """Return the field name and the magnitude of a result."""
+    target = units.get(key)
+    if hasattr(value, 'magnitude'):  # a pint quantity
+        if target is not None:
+            value = convert(value, target)
+        else:
+            target = f'{value.units:~}'
+        value = value.magnitude
+    name = f'{key} [{target}]' if target else key
+    return name, value
+
+
+def _is_zone_result(value: Any) -> bool:
+    return np.ndim(getattr(value, 'magnitude', value)) > 0
+
+
+def to_record(results: Dict[str, Any], units: Optional[Dict[str, str]] = None, **params: Any) -> np.ndarray:
+    """Return the scalar results of one run as a structured array with one
+    row.
+
+    Params:
+    - results : Dict[str, Any]
+        Results of one run: pint quantities or numbers.
+    - units : Dict[str, str], optional
+        Units per result. Quantities are converted to these units; for
+        numbers they are the units the numbers are expressed in (e.g.
+        `batch.vav.RESULT_UNITS`). Quantities without an entry keep their
+        own units.
+    - params : Any
+        Values that identify the run (e.g. the outdoor air temperature or a
+        case name). They become the first fields of the record.
+
+    Raises a TypeError if a result is not a number or a quantity.
+    """
+    units = units or {}
+    names, values = [], []
+    for key, value in list(params.items()) + list(results.items()):
+        if key in results and _is_zone_result(value):
+            continue
+        name, value = _field(key, value, units)
+        if not isinstance(value, (int, float, np.number, str)):
+            raise TypeError(f"result '{key}' of type {type(value).__name__} cannot be stored in a record")
+        names.append(name)
+        values.append(value)
+    formats = [object if isinstance(value, str) else np.float64 for value in values]
+    record = np.empty(1, dtype={'names': names, 'formats': formats})
+    record[0] = tuple(values)
+    return record
+
+
+def to_zone_records(
+    results: Dict[str, Any],
+    names: Sequence[str],
+    units: Optional[Dict[str, str]] = None
+) -> np.ndarray:
+    """Return the zone results of one run (the arrays with one element per
+    zone) as a structured array with one row per zone, the first field
+    being the zone name."""
+    units = units or {}
+    fields, columns = ['zone'], [np.asarray(names, dtype=object)]
+    for key, value in results.items():
+        if _is_zone_result(value):
+            name, value = _field(key, value, units)
+            fields.append(name)
+            columns.append(np.asarray(value, dtype=float))
+    records = np.empty(len(names), dtype={'names': fields, 'formats': [object] + [np.float64] * (len(fields) - 1)})
+    for field, column in zip(fields, columns):
+        records[field] = column
+    return records
+
+
+def concatenate(records: Sequence[np.ndarray]) -> np.ndarray:
+    """Join the records of many runs into one structured array.
+
+    Raises a ValueError if the records do not have the same fields.
+    """
+    dtype = records[0].dtype
+    for record in records[1:]:
+        if record.dtype != dtype:
+            raise ValueError(f'records with different fields: {dtype.names} and {record.dtype.names}')
+    return np.concatenate(records)
+
+
+def to_frame(records: Sequence[np.ndarray]):
+    """Return the records of many runs as a Pandas DataFrame, with the field
+    names as column names."""
+    import pandas as pd
+    return pd.DataFrame.from_records(concatenate(records))
@@ -0,0 +1,211 @@
+"""Energy recovery between outdoor air and exhaust air.
+
+An enthalpy wheel (sensible and latent recovery) or a plate heat exchanger
+(sensible recovery only) between the outdoor air intake and the exhaust air
+conditions the outdoor air before it is mixed with the return air. The
+leaving states follow from the effectiveness of the exchanger:
+
+    T_supply_out = T_supply_in + eps_sen * m_min / m_supply * (T_exhaust_in - T_supply_in)
+    W_supply_out = W_supply_in + eps_lat * m_min / m_supply * (W_exhaust_in - W_supply_in)
+
+with m_min the smaller of both mass flow rates; the exhaust air leaving state
+follows from the energy and moisture balances. The effectiveness can be
+constant, or depend on the air flow rate as in AHRI 1060 ratings, which
+give it at 100 % and 75 % of the nominal air flow rate.
+
+`HeatRecovery.evaluate` takes arrays, e.g. hourly values of a whole year;
+`HeatRecovery.process` takes two `hvac` `AirStream` objects and returns a
+`RecoveryProcess` with the entering and leaving streams and the loads as
+quantities, like an `AirConditioningProcess`.
+
+All quantities are in SI units (see `batch.psychrometrics`). Condensation and
+frosting in the exchanger are not modelled.
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from . import psychrometrics as psy
+from .psychrometrics import ArrayLike
+
+
+RESULT_UNITS = {
+    'T_supply_out': 'degC',
+    'W_supply_out': 'kg / kg',
+    'T_exhaust_out': 'degC',
+    'W_exhaust_out': 'kg / kg',
+    'Q': 'W',
+    'Q_sen': 'W',
+    'Q_lat': 'W'
+}
+
+
+class HeatRecovery:
+    """An air-to-air heat (and moisture) exchanger.
+
+    Params:
+    - eps_sensible : float
+        Sensible effectiveness at nominal air flow rate (fraction).
+    - eps_latent : float
+        Latent effectiveness at nominal air flow rate (fraction); 0 for a
+        plate heat exchanger.
+    - m_nominal : float, optional
+        Nominal mass flow rate of air (kg/s). Needed if the effectiveness
+        at 75 % flow is given.
+    - eps_sensible_75, eps_latent_75 : float, optional
+        Effectiveness at 75 % of the nominal air flow rate. At other flow
+        rates the effectiveness is interpolated (or extrapolated) linearly
+        between the 75 % and 100 % values, with the mean of the supply and
+        exhaust air flow rates. If omitted, the effectiveness is constant.
+    """
+    def __init__(
+        self,
+        eps_sensible: float,
+        eps_latent: float = 0.0,
+        m_nominal: Optional[float] = None,
+        eps_sensible_75: Optional[float] = None,
+        eps_latent_75: Optional[float] = None
+    ):
+        flow_dependent = eps_sensible_75 is not None or eps_latent_75 is not None
+        if flow_dependent and m_nominal is None:
+            raise ValueError('the nominal air flow rate is needed for a flow-dependent effectiveness')
+        self.eps_sensible = eps_sensible
+        self.eps_latent = eps_latent
+        self.m_nominal = m_nominal
+        self.eps_sensible_75 = eps_sensible if eps_sensible_75 is None else eps_sensible_75
+        self.eps_latent_75 = eps_latent if eps_latent_75 is None else eps_latent_75
+
+    def effectiveness(self, m_supply: ArrayLike, m_exhaust: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the sensible and latent effectiveness at the given mass flow
+        rates of supply (outdoor) air and exhaust air."""
+        if self.m_nominal is None:
+            shape = np.broadcast(m_supply, m_exhaust).shape
+            return np.full(shape, self.eps_sensible), np.full(shape, self.eps_latent)
+        f = (np.asarray(m_supply) + np.asarray(m_exhaust)) / (2.0 * self.m_nominal)
+        eps_sensible = self.eps_sensible_75 + (self.eps_sensible - self.eps_sensible_75) * (f - 0.75) / 0.25
+        eps_latent = self.eps_latent_75 + (self.eps_latent - self.eps_latent_75) * (f - 0.75) / 0.25
+        return np.clip(eps_sensible, 0.0, 1.0), np.clip(eps_latent, 0.0, 1.0)
+
+    def evaluate(
+        self,
+        m_supply: ArrayLike,
+        T_supply_in: ArrayLike,
+        W_supply_in: ArrayLike,
+        m_exhaust: ArrayLike,
+        T_exhaust_in: ArrayLike,
+        W_exhaust_in: ArrayLike,
+        active: ArrayLike = True
+    ) -> Dict[str, np.ndarray]:
+        """Return the leaving air states of the exchanger.
+
+        Params:
+        - m_supply, T_supply_in, W_supply_in : ArrayLike
+            Mass flow rate and entering state of the supply (outdoor) air.
+        - m_exhaust, T_exhaust_in, W_exhaust_in : ArrayLike
+            Mass flow rate and entering state of the exhaust air.
+        - active : ArrayLike
+            False where the exchanger is switched off or bypassed (e.g. when
+            recovery would increase the cooling load).
+
+        Returns a dict of arrays: the leaving states `T_supply_out`,
+        `W_supply_out`, `T_exhaust_out`, `W_exhaust_out` and the heat
+        transferred to the supply air `Q` (W), with its sensible part
+        `Q_sen` and latent part `Q_lat`.
+        """
+        m_supply, T_supply_in, W_supply_in, m_exhaust, T_exhaust_in, W_exhaust_in = (
+            np.asarray(a, dtype=float)
+            for a in (m_supply, T_supply_in, W_supply_in, m_exhaust, T_exhaust_in, W_exhaust_in)
+        )
+        eps_sensible, eps_latent = self.effectiveness(m_supply, m_exhaust)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(active, np.minimum(m_supply, m_exhaust) / m_supply, 0.0)
+        ratio = np.nan_to_num(ratio)
+        T_supply_out = T_supply_in + eps_sensible * ratio * (T_exhaust_in - T_supply_in)
+        W_supply_out = W_supply_in + eps_latent * ratio * (W_exhaust_in - W_supply_in)
+        Q_sen = m_supply * psy.cp_humid(W_supply_in) * (T_supply_out - T_supply_in)
+        Q = m_supply * (psy.enthalpy(T_supply_out, W_supply_out) - psy.enthalpy(T_supply_in, W_supply_in))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            flow_ratio = np.nan_to_num(m_supply / m_exhaust)
+        W_exhaust_out = W_exhaust_in - flow_ratio * (W_supply_out - W_supply_in)
+        h_exhaust_out = psy.enthalpy(T_exhaust_in, W_exhaust_in) - flow_ratio * (
+            psy.enthalpy(T_supply_out, W_supply_out) - psy.enthalpy(T_supply_in, W_supply_in)
+        )
+        return {
+            'T_supply_out': T_supply_out,
+            'W_supply_out': W_supply_out,
+            'T_exhaust_out': psy.Tdb_from_h(h_exhaust_out, W_exhaust_out),
+            'W_exhaust_out': W_exhaust_out,
+            'Q': Q,
+            'Q_sen': Q_sen,
+            'Q_lat': Q - Q_sen
+        }
+
+    def process(self, supply, exhaust) -> 'RecoveryProcess':
+        """Evaluate the exchanger for the entering `hvac.air_conditioning.
+        AirStream` objects `supply` (outdoor air) and `exhaust`, with scalar
+        quantities. Returns a `RecoveryProcess`."""
+        from hvac import Quantity
+        from hvac.fluids import HumidAir
+        from hvac.air_conditioning import AirStream
+        results = self.evaluate(
+            supply.m_da.to('kg / s').m, supply.state.Tdb.to('degC').m, supply.state.W.to('kg / kg').m,
+            exhaust.m_da.to('kg / s').m, exhaust.state.Tdb.to('degC').m, exhaust.state.W.to('kg / kg').m
+        )
+        supply_out = AirStream(
+            state=HumidAir(
+                Tdb=Quantity(float(results['T_supply_out']), 'degC'),
+                W=Quantity(float(results['W_supply_out']), 'kg / kg')
+            ),
+            m_da=supply.m_da
+        )
+        exhaust_out = AirStream(
+            state=HumidAir(
+                Tdb=Quantity(float(results['T_exhaust_out']), 'degC'),
+                W=Quantity(float(results['W_exhaust_out']), 'kg / kg')
+            ),
+            m_da=exhaust.m_da
+        )
+        return RecoveryProcess(
+            supply, supply_out, exhaust, exhaust_out,
+            *(Quantity(float(results[k]), 'W') for k in ('Q', 'Q_sen', 'Q_lat'))
+        )
+
+
+class RecoveryProcess:
+    """The result of `HeatRecovery.process`. Seen from the supply (outdoor)
+    air, it has the attributes of an `AirConditioningProcess`: `air_in`,
+    `air_out`, `m_da`, `Q`, `Q_sen`, `Q_lat` and `SHR`.
+
+    Params:
+    - supply_in, supply_out : AirStream
+        Entering and leaving supply (outdoor) air.
+    - exhaust_in, exhaust_out : AirStream
+        Entering and leaving exhaust air.
+    - Q, Q_sen, Q_lat : Quantity
+        Heat transferred to the supply air (negative if the supply air is
+        cooled), and its sensible and latent part.
+    """
+    def __init__(self, supply_in, supply_out, exhaust_in, exhaust_out, Q, Q_sen, Q_lat):
+        self.supply_in = supply_in
+        self.supply_out = supply_out
+        self.exhaust_in = exhaust_in
+        self.exhaust_out = exhaust_out
+        self.Q = Q
+        self.Q_sen = Q_sen
+        self.Q_lat = Q_lat
+
+    @property
+    def air_in(self):
+        return self.supply_in.state
+
+    @property
+    def air_out(self):
+        return self.supply_out.state
+
+    @property
+    def m_da(self):
+        return self.supply_in.m_da
+
+    @property
+    def SHR(self):
+        return self.Q_sen / self.Q
@@ -0,0 +1,158 @@
+"""Supply air states that compensate the load of a space, vectorized.
+
+The supply air states that compensate a space load with a given sensible heat
+ratio lie on the space condition line (`hvac.air_conditioning.
+SpaceConditionLine`) through the state of the space air. The load and the
+sensible heat ratio are split as follows (the latent part being the heat of
+vaporization of the moisture the air takes up, at space air temperature):
+- Q_sen = SHR * Q = m * cp(W_supply) * (T_space - T_supply)
+- Q_lat = (1 - SHR) * Q = m * (W_space - W_supply) * (H_FG + CP_V * T_space)
+and their sum is the enthalpy balance Q = m * (h_space - h_supply).
+
+The supply air state on the line is solved at a chosen dry-bulb temperature
+(`supply_air_at_Tdb`) or humidity ratio (`supply_air_at_W`), and the line's
+intersection with the saturation line is found by `saturation_point`, for
+arrays of space air states, loads and sensible heat ratios at once.
+`space_condition_line` does both in one call.
+
+All quantities are in SI units (see `batch.psychrometrics`).
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from . import psychrometrics as psy
+from .psychrometrics import ArrayLike
+
+
+def _W_at_Tdb(T_space, W_space, SHR, T):
+    dT = T_space - T
+    h_g = psy.H_FG + psy.CP_V * T_space
+    # the latent/sensible ratio of the load, multiplied out by SHR so that
+    # SHR = 0 (a purely latent load) is allowed
+    return (SHR * W_space * h_g - (1.0 - SHR) * psy.CP_DA * dT) / (SHR * h_g + (1.0 - SHR) * psy.CP_V * dT)
+
+
+def _m_supply(T_space, W_space, Q, T_supply, W_supply):
+    return Q / (psy.enthalpy(T_space, W_space) - psy.enthalpy(T_supply, W_supply))
+
+
+def supply_air_at_Tdb(
+    T_space: ArrayLike,
+    W_space: ArrayLike,
+    Q: ArrayLike,
+    SHR: ArrayLike,
+    T_supply: ArrayLike
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the humidity ratio and the mass flow rate of supply air at
+    dry-bulb temperature `T_supply` that compensates the space load `Q` (W,
+    positive for a cooling load) with sensible heat ratio `SHR` (fraction,
+    Q_sen / (Q_sen + Q_lat)). This is the counterpart of
+    `AirConditioningProcess(T_ai=..., air_out=..., Q=..., SHR=...)`.
+    """
+    T_space, W_space, Q, SHR, T_supply = (
+        np.asarray(a, dtype=float) for a in (T_space, W_space, Q, SHR, T_supply)
+    )
+    W_supply = _W_at_Tdb(T_space, W_space, SHR, T_supply)
+    return W_supply, _m_supply(T_space, W_space, Q, T_supply, W_supply)
+
+
+def supply_air_at_W(
+    T_space: ArrayLike,
+    W_space: ArrayLike,
+    Q: ArrayLike,
+    SHR: ArrayLike,
+    W_supply: ArrayLike
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the dry-bulb temperature and the mass flow rate of supply air
+    with humidity ratio `W_supply` that compensates the space load `Q` with
+    sensible heat ratio `SHR`, the counterpart of
+    `AirConditioningProcess(W_ai=..., air_out=..., Q=..., SHR=...)`.
+
+    For a purely sensible load (SHR = 1) the line is horizontal, so the
+    humidity ratio does not determine a point on it: the result is NaN
+    (also when `W_supply` equals `W_space`).
+    """
+    T_space, W_space, Q, SHR, W_supply = (
+        np.asarray(a, dtype=float) for a in (T_space, W_space, Q, SHR, W_supply)
+    )
+    h_g = psy.H_FG + psy.CP_V * T_space
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dT = SHR * h_g * (W_space - W_supply) / ((1.0 - SHR) * psy.cp_humid(W_supply))
+        T_supply = np.where(np.isfinite(dT), T_space - dT, np.nan)
+        return T_supply, _m_supply(T_space, W_space, Q, T_supply, W_supply)
+
+
+def saturation_point(
+    T_space: ArrayLike,
+    W_space: ArrayLike,
+    SHR: ArrayLike,
+    T_min: float = -40.0,
+    step: float = 1.0,
+    tol: float = 1.0e-6
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the dry-bulb temperature and the humidity ratio of the point
+    where the space condition line, followed from the space air state to
+    lower temperatures, reaches the saturation line (the end point of the
+    line on a psychrometric chart). Lines that do not reach saturation
+    above `T_min` give NaN.
+
+    The line is scanned in steps of `step` kelvin for the first temperature
+    at which it lies above the saturation line; the intersection is then
+    found by bisection, for all lines at once.
+    """
+    T_space, W_space, SHR = (
+        a.astype(float) for a in np.broadcast_arrays(np.asarray(T_space), np.asarray(W_space), np.asarray(SHR))
+    )
+    n_steps = max(int(np.ceil((np.max(T_space) - T_min) / step)), 1)
+    T_grid = T_space[..., np.newaxis] - step * np.arange(n_steps + 1)
+    args = (T_space[..., np.newaxis], W_space[..., np.newaxis], SHR[..., np.newaxis])
+    above = (_W_at_Tdb(*args, T_grid) > psy.W_saturated(T_grid)) & (T_grid >= T_min)
+    found = above.any(axis=-1)
+    first = np.argmax(above, axis=-1)[..., np.newaxis]
+    lo = np.take_along_axis(T_grid, first, axis=-1)[..., 0]
+    hi = np.take_along_axis(T_grid, np.maximum(first - 1, 0), axis=-1)[..., 0]
+    while np.any(hi - lo > tol):
+        mid = 0.5 * (lo + hi)
+        mid_above = _W_at_Tdb(T_space, W_space, SHR, mid) > psy.W_saturated(mid)
+        lo = np.where(mid_above, mid, lo)
+        hi = np.where(mid_above, hi, mid)
+    T_sat = np.where(found, 0.5 * (lo + hi), np.nan)
+    return T_sat, np.where(found, psy.W_saturated(T_sat), np.nan)
+
+
+def space_condition_line(
+    T_space: ArrayLike,
+    W_space: ArrayLike,
+    Q: ArrayLike,
+    SHR: ArrayLike,
+    T_supply: Optional[ArrayLike] = None,
+    W_supply: Optional[ArrayLike] = None
+) -> Dict[str, np.ndarray]:
+    """Solve the supply air state on the space condition line at the given
+    dry-bulb temperatures `T_supply` or humidity ratios `W_supply` (exactly
+    one of them must be given), together with the saturation point of the
+    line.
+
+    Returns a dict with arrays 'T_supply', 'W_supply', 'm_supply',
+    'T_saturation' and 'W_saturation'.
+
+    Raises a ValueError if neither or both of `T_supply` and `W_supply` are
+    given.
+    """
+    if (T_supply is None) == (W_supply is None):
+        raise ValueError('either `T_supply` or `W_supply` must be given')
+    if T_supply is not None:
+        T_supply = np.asarray(T_supply, dtype=float)
+        W_supply, m_supply = supply_air_at_Tdb(T_space, W_space, Q, SHR, T_supply)
+    else:
+        W_supply = np.asarray(W_supply, dtype=float)
+        T_supply, m_supply = supply_air_at_W(T_space, W_space, Q, SHR, W_supply)
+    T_saturation, W_saturation = saturation_point(T_space, W_space, SHR)
+    return {
+        'T_supply': T_supply,
+        'W_supply': W_supply,
+        'm_supply': m_supply,
+        'T_saturation': T_saturation,
+        'W_saturation': W_saturation
+    }
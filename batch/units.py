@@ -0,0 +1,43 @@
+"""Cached unit conversion of pint quantities.
+
+On every call of `Quantity.to` pint parses the unit string and works out the
+conversion between the units again. `batch.records` converts every result of
+every run to the units of its field; `convert` does the parsing and the
+conversion only once for each pair of units: every conversion between pint
+units is of the form `a * x + b` (`b` is only non-zero for temperatures), so
+the coefficients can be cached and applied to any magnitude.
+"""
+from functools import lru_cache
+from typing import Tuple
+
+
+@lru_cache(maxsize=None)
+def _parse_units(quantity_cls, units: str):
+    return quantity_cls(1.0, units).units
+
+
+@lru_cache(maxsize=None)
+def _conversion(quantity_cls, from_units, to_units) -> Tuple[float, float]:
+    b = quantity_cls(0.0, from_units).to(to_units).magnitude
+    a = quantity_cls(1.0, from_units).to(to_units).magnitude - b
+    return a, b
+
+
+def convert(quantity, units: str):
+    """Convert a pint `Quantity` to other units, like `quantity.to(units)`.
+
+    Params:
+    - quantity : Quantity
+        The quantity to be converted (e.g. a `hvac.Quantity`).
+    - units : str
+        The units to convert to, e.g. 'Btu / hr'.
+
+    Raises a pint `DimensionalityError` if the units are not compatible.
+    """
+    # The class of a pint quantity is bound to its unit registry, so the
+    # caches are kept per registry.
+    quantity_cls = type(quantity)
+    to_units = _parse_units(quantity_cls, units)
+    a, b = _conversion(quantity_cls, quantity.units, to_units)
+    magnitude = quantity.magnitude * a + b if b else quantity.magnitude * a
+    return quantity_cls(magnitude, to_units)
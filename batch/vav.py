@@ -0,0 +1,505 @@
+"""Multi-zone VAV system calculations, vectorized over the zones.
+
+The calculations follow the design procedure worked out step by step in
+`vav_multizone_design_p1` (zone supply air flow rates from the sensible zone
+loads, fan heating, return air from the zones, mixing with ventilation air,
+cooling coil). Instead of solving the zones one after another, all zones are
+handled at once with NumPy arrays. The zones are only coupled through the
+common supply air state and the return air, so the system of equations can be
+reduced to the supply air state alone (the zone unknowns are eliminated zone
+by zone). That leaves one or two unknowns, whatever the number of zones, and
+the computation time grows linearly with the number of zones.
+
+All quantities are in SI units (see `batch.psychrometrics`); zone quantities
+are arrays with one element per zone.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from . import psychrometrics as psy
+from .fans import Fan
+
+
+# units of the entries in the dicts returned by the functions of this module
+# (see `batch.records`)
+RESULT_UNITS = {
+    'T_supply': 'degC',
+    'W_supply': 'kg / kg',
+    'm_supply': 'kg / s',
+    'm_supply_tot': 'kg / s',
+    'V_supply': 'm ** 3 / s',
+    'W_zone': 'kg / kg',
+    'm_return': 'kg / s',
+    'T_return': 'degC',
+    'W_return': 'kg / kg',
+    'm_vent': 'kg / s',
+    'T_mixed': 'degC',
+    'W_mixed': 'kg / kg',
+    'dT_fan': 'K',
+    'W_fan': 'W',
+    'T_cooled': 'degC',
+    'W_cooled': 'kg / kg',
+    'm_condensate': 'kg / s',
+    'Q_cooling_coil': 'W',
+    'T_zone_supply': 'degC',
+    'Q_preheat_coil': 'W',
+    'Q_preheat_coil_peak': 'W',
+    'Q_reheat_coil': 'W',
+    'E_preheat_coil': 'J',
+    'E_cooling_coil': 'J',
+    'E_fan': 'J',
+    'E_reheat_coil': 'J'
+}
+
+
+def _zone_flows(Q_sen: np.ndarray, T_zone: np.ndarray, T_supply: float, W_supply: float) -> np.ndarray:
+    """Supply air mass flow rates that compensate the sensible zone loads."""
+    return Q_sen / (psy.cp_humid(W_supply) * (T_zone - T_supply))
+
+
+def _fan_heating(T_supply: float, W_supply: float, fan_pressure: float, fan_efficiency: float, P: float) -> float:
+    """Temperature rise of the air through the supply fan (the fan and motor
+    heat ends up in the air stream): dT = v * dP / (eta * cp)."""
+    return psy.specific_volume(T_supply, W_supply, P) * fan_pressure / (fan_efficiency * psy.cp_humid(W_supply))
+
+
+def _return_air(m_supply, Q_lat, T_zone, W_supply, m_exhaust):
+    """Zone air humidity ratios and the state of the mixed return air."""
+    W_zone = W_supply + Q_lat / (m_supply * psy.H_FG)
+    m_return = m_supply - m_exhaust
+    m_return_tot = m_return.sum()
+    W_return = (m_return * W_zone).sum() / m_return_tot
+    h_return = (m_return * psy.enthalpy(T_zone, W_zone)).sum() / m_return_tot
+    return W_zone, m_return_tot, psy.Tdb_from_h(h_return, W_return), W_return
+
+
+def _system_results(
+    Q_sen, Q_lat, T_zone, m_exhaust, T_supply, W_supply, T_outdoor, W_outdoor, V_vent,
+    fan_pressure, fan_efficiency, P, fan=None, m_supply_min=None
+) -> Dict[str, np.ndarray]:
+    """Everything downstream of a known supply air state: zone flows, return
+    air, mixed air (ventilation air replaces the exhausted air) and fan (at
+    constant pressure and efficiency, or `fan` at the supply air flow rate).
+    If `m_supply_min` is given, zone flows are not reduced below it and the
+    zones that get more air than their load needs are reheated."""
+    m_supply = _zone_flows(Q_sen, T_zone, T_supply, W_supply)
+    if m_supply_min is not None:
+        # a zone without a cooling load gets a negative flow rate: it is
+        # clamped as well
+        clamped = ~(m_supply > m_supply_min)
+        m_supply = np.where(clamped, m_supply_min, m_supply)
+    m_supply_tot = m_supply.sum()
+    W_zone, m_return, T_return, W_return = _return_air(m_supply, Q_lat, T_zone, W_supply, m_exhaust)
+    m_vent = min(psy.density(T_outdoor, W_outdoor, P) * V_vent, m_supply_tot)
+    T_mixed, W_mixed = psy.mix(m_vent, T_outdoor, W_outdoor, m_supply_tot - m_vent, T_return, W_return)
+    V_supply = m_supply_tot * psy.specific_volume(T_supply, W_supply, P)
+    if fan is None:
+        dT_fan = _fan_heating(T_supply, W_supply, fan_pressure, fan_efficiency, P)
+        W_fan = V_supply * fan_pressure / fan_efficiency
+    else:
+        fan_results = fan.part_load(m_supply_tot, T_supply, W_supply, P)
+        dT_fan, W_fan = float(fan_results['dT']), float(fan_results['W_fan'])
+    results = {
+        'T_supply': T_supply,
+        'W_supply': W_supply,
+        'm_supply': m_supply,
+        'm_supply_tot': m_supply_tot,
+        'V_supply': V_supply,
+        'W_zone': W_zone,
+        'm_return': m_return,
+        'T_return': T_return,
+        'W_return': W_return,
+        'm_vent': m_vent,
+        'T_mixed': T_mixed,
+        'W_mixed': W_mixed,
+        'dT_fan': dT_fan,
+        'W_fan': W_fan,
+        'T_cooled': T_supply - dT_fan
+    }
+    if m_supply_min is not None:
+        results.update(_reheat(Q_sen, T_zone, T_supply, W_supply, m_supply, clamped))
+    return results
+
+
+def _reheat(Q_sen, T_zone, T_supply, W_supply, m_supply, clamped) -> Dict[str, np.ndarray]:
+    """Supply air temperatures of the zones and reheat coil loads when the
+    zone flow rates are clamped at their minimum."""
+    cp = psy.cp_humid(W_supply)
+    T_zone_supply = np.where(clamped, T_zone - Q_sen / (m_supply * cp), T_supply)
+    return {
+        'clamped': clamped,
+        'T_zone_supply': T_zone_supply,
+        'Q_reheat_coil': m_supply * cp * (T_zone_supply - T_supply)
+    }
+
+
+def _cooling_coil(results: Dict[str, np.ndarray], W_cooled: float):
+    """Add the cooling coil load and the condensate flow rate to `results`."""
+    m = results['m_supply_tot']
+    T_cooled = results['T_cooled']
+    m_condensate = m * max(results['W_mixed'] - W_cooled, 0.0)
+    h_mixed = psy.enthalpy(results['T_mixed'], results['W_mixed'])
+    h_cooled = psy.enthalpy(T_cooled, W_cooled)
+    results['W_cooled'] = W_cooled
+    results['m_condensate'] = m_condensate
+    results['Q_cooling_coil'] = m * (h_mixed - h_cooled) - m_condensate * psy.CP_W * T_cooled
+    return results
+
+
+def design_summer(
+    Q_sen: np.ndarray,
+    Q_lat: np.ndarray,
+    T_zone: np.ndarray,
+    T_outdoor: float,
+    W_outdoor: float,
+    V_vent: float,
+    dT_supply: float,
+    RH_cooled: float,
+    fan_pressure: float,
+    fan_efficiency: float,
+    m_exhaust: Optional[np.ndarray] = None,
+    P: float = psy.P_ATM,
+    tol: float = 1.0e-12
+) -> Dict[str, np.ndarray]:
+    """Summer design of a multi-zone VAV system.
+
+    The supply air temperature is `dT_supply` below the lowest zone air
+    temperature. The air leaves the cooling coil with relative humidity
+    `RH_cooled` and is heated by the supply fan before it enters the zones.
+
+    Params:
+    - Q_sen, Q_lat : np.ndarray
+        Sensible and latent design cooling loads of the zones (W).
+    - T_zone : np.ndarray
+        Zone air temperatures (°C).
+    - T_outdoor, W_outdoor : float
+        Outdoor air state at design conditions.
+    - V_vent : float
+        Volume flow rate of ventilation air (m³/s).
+    - dT_supply : float
+        Temperature difference between zone air and supply air (K).
+    - RH_cooled : float
+        Relative humidity of the air leaving the cooling coil (fraction).
+    - fan_pressure, fan_efficiency : float
+        Supply fan pressure (Pa) and efficiency (fraction).
+    - m_exhaust : np.ndarray, optional
+        Air mass flow rates exhausted from the zones (kg/s), not returned to
+        the air handling unit.
+
+    Returns a dict with the zone supply air flow rates `m_supply` and zone
+    air humidity ratios `W_zone` (arrays), and the states, flow rates and
+    loads of the system (floats).
+    """
+    Q_sen, Q_lat, T_zone = (np.asarray(a, dtype=float) for a in (Q_sen, Q_lat, T_zone))
+    m_exhaust = np.zeros_like(Q_sen) if m_exhaust is None else np.asarray(m_exhaust, dtype=float)
+    T_supply = float(T_zone.min()) - dT_supply
+    # the humidity ratio of the supply air (leaving the coil at RH_cooled)
+    # depends only slightly on the fan heating, which in turn depends on it
+    W_supply = psy.W_from_RH(T_supply, RH_cooled, P)
+    for _ in range(50):
+        dT_fan = _fan_heating(T_supply, W_supply, fan_pressure, fan_efficiency, P)
+        W_new = float(psy.W_from_RH(T_supply - dT_fan, RH_cooled, P))
+        converged = abs(W_new - W_supply) < tol
+        W_supply = W_new
+        if converged:
+            break
+    results = _system_results(
+        Q_sen, Q_lat, T_zone, m_exhaust, T_supply, W_supply, T_outdoor, W_outdoor, V_vent,
+        fan_pressure, fan_efficiency, P
+    )
+    return _cooling_coil(results, W_supply)
+
+
+def part_load_summer(
+    Q_sen: np.ndarray,
+    Q_lat: np.ndarray,
+    T_zone: np.ndarray,
+    T_outdoor: float,
+    W_outdoor: float,
+    V_vent: float,
+    T_supply: float,
+    T_adp: float,
+    fan_pressure: float,
+    fan_efficiency: float,
+    m_exhaust: Optional[np.ndarray] = None,
+    fan: Optional[Fan] = None,
+    m_supply_min: Optional[np.ndarray] = None,
+    P: float = psy.P_ATM,
+    tol: float = 1.0e-12,
+    max_iter: int = 50
+) -> Dict[str, np.ndarray]:
+    """Summer operation of a multi-zone VAV system at part load.
+
+    The cooling coil is controlled to keep the supply air temperature at
+    `T_supply`. The process line of the coil points at the apparatus dew
+    point `T_adp` (set by the chilled-water temperature). The humidity of
+    the air leaving the coil then depends on the mixed air humidity, which
+    depends on the return air humidity from the zones, which in turn depends
+    on the supply air humidity: the supply air humidity ratio is solved for
+    (secant method), with all zone equations evaluated as arrays.
+
+    Params: see `design_summer`, and:
+    - T_supply : float
+        Supply air temperature set point (°C).
+    - T_adp : float
+        Apparatus dew point of the cooling coil (°C).
+    - fan : batch.fans.Fan, optional
+        If given, the power and the heat pickup of the supply fan follow
+        from its part-load behavior at the supply air flow rate, instead of
+        from `fan_pressure` and `fan_efficiency`.
+    - m_supply_min : np.ndarray, optional
+        Minimum supply air flow rates of the zones (kg/s), e.g.
+        `0.6 * design['m_supply']` (a VAV box is not closed further than
+        its minimum position). A zone whose sensible load needs less air gets
+        its minimum flow rate and the air is reheated to the temperature
+        that matches the load. The results then also contain, per zone, the
+        flags `clamped`, the supply air temperatures `T_zone_supply` (after
+        reheat) and the reheat coil loads `Q_reheat_coil`.
+
+    Raises a ValueError if the mixed air is colder than the air leaving the
+    cooling coil should be (no cooling needed to reach `T_supply`).
+    """
+    Q_sen, Q_lat, T_zone = (np.asarray(a, dtype=float) for a in (Q_sen, Q_lat, T_zone))
+    m_exhaust = np.zeros_like(Q_sen) if m_exhaust is None else np.asarray(m_exhaust, dtype=float)
+    if m_supply_min is not None:
+        m_supply_min = np.asarray(m_supply_min, dtype=float)
+    W_adp = float(psy.W_saturated(T_adp, P))
+
+    def evaluate(W_supply: float):
+        results = _system_results(
+            Q_sen, Q_lat, T_zone, m_exhaust, T_supply, W_supply, T_outdoor, W_outdoor, V_vent,
+            fan_pressure, fan_efficiency, P, fan, m_supply_min
+        )
+        T_mixed, W_mixed, T_cooled = results['T_mixed'], results['W_mixed'], results['T_cooled']
+        if T_mixed <= T_cooled:
+            raise ValueError(
+                f'mixed air ({T_mixed:.2f} °C) is colder than the cooling coil '
+                f'leaving air should be ({T_cooled:.2f} °C)'
+            )
+        beta = (T_mixed - T_cooled) / (T_mixed - T_adp)  # contact factor
+        W_cooled = W_mixed - beta * (W_mixed - W_adp) if W_mixed > W_adp else W_mixed
+        return results, W_cooled
+
+    W0 = W_adp
+    results, W_cooled = evaluate(W0)
+    r0 = W0 - W_cooled
+    W1 = W_cooled
+    for _ in range(max_iter):
+        results, W_cooled = evaluate(W1)
+        r1 = W1 - W_cooled
+        if abs(r1) < tol or r1 == r0:
+            break
+        W0, W1, r0 = W1, W1 - r1 * (W1 - W0) / (r1 - r0), r1
+    else:
+        raise RuntimeError('supply air humidity ratio did not converge')
+    return _cooling_coil(results, W_cooled)
+
+
+def _winter_results(
+    Q_sen, Q_lat, T_zone, m_exhaust, T_outdoor, W_outdoor, V_vent, T_supply_max, T_supply_min,
+    m_supply_min, fan_pressure, fan_efficiency, fan, P
+) -> Dict[str, np.ndarray]:
+    """The winter procedure of `vav_multizone_design_p1`. Zone arrays have
+    the zones along the last axis; system quantities have the shape of the
+    zone arrays without the last axis (e.g. one value per hour)."""
+    T_outdoor = np.asarray(T_outdoor, dtype=float)
+    W_outdoor = np.asarray(W_outdoor, dtype=float)
+    zone = (..., np.newaxis)  # index that broadcasts a system quantity over the zones
+    m_vent_max = psy.density(T_outdoor, W_outdoor, P) * V_vent
+    if np.any(m_vent_max <= 0.0):
+        raise ValueError(
+            'no outdoor air is supplied (V_vent = 0): without ventilation the humidity '
+            'of the recirculated air has no steady state'
+        )
+    # zones with a heating load get air at T_supply_max, the others at
+    # T_supply_min; the flow rates are not reduced below the minimum flow
+    # rates. The specific heat of the supply air depends on its humidity,
+    # which depends on the flow rates: a few passes make both consistent.
+    cp = psy.cp_humid(W_outdoor)
+    for _ in range(20):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m_supply = np.where(
+                Q_sen < 0.0,
+                Q_sen / (cp[zone] * (T_zone - T_supply_max)),
+                Q_sen / (cp[zone] * (T_zone - T_supply_min))
+            )
+        m_supply = np.maximum(m_supply, m_supply_min)
+        m_supply_tot = m_supply.sum(axis=-1)
+        m_return = m_supply - m_exhaust
+        m_return_tot = m_return.sum(axis=-1)
+        m_vent = np.minimum(m_vent_max, m_supply_tot)
+        # The supply air has the humidity of the mixed air. With the moisture
+        # the zones add to the return air, the mixing balance gives it in
+        # closed form: m_vent * (W_supply - W_outdoor) = (m_supply_tot - m_vent) * dW_return.
+        dW_return = (m_return * Q_lat / (m_supply * psy.H_FG)).sum(axis=-1) / m_return_tot
+        W_supply = W_outdoor + (m_supply_tot - m_vent) * dW_return / m_vent
+        cp_supply = psy.cp_humid(W_supply)
+        if np.all(np.abs(cp_supply - cp) < 1.0e-9):
+            break
+        cp = cp_supply
+    W_zone = W_supply[zone] + Q_lat / (m_supply * psy.H_FG)
+    T_zone_supply = T_zone - Q_sen / (m_supply * cp[zone])
+    T_supply = T_zone_supply.min(axis=-1)
+    h_return = (m_return * psy.enthalpy(T_zone, W_zone)).sum(axis=-1) / m_return_tot
+    W_return = (m_return * W_zone).sum(axis=-1) / m_return_tot
+    T_return = psy.Tdb_from_h(h_return, W_return)
+    T_mixed, W_mixed = psy.mix(m_vent, T_outdoor, W_outdoor, m_supply_tot - m_vent, T_return, W_return)
+    V_supply = m_supply_tot * psy.specific_volume(T_supply, W_supply, P)
+    if fan is None:
+        dT_fan = _fan_heating(T_supply, W_supply, fan_pressure, fan_efficiency, P)
+        W_fan = V_supply * fan_pressure / fan_efficiency
+    else:
+        fan_results = fan.part_load(m_supply_tot, T_supply, W_supply, P)
+        dT_fan, W_fan = fan_results['dT'], fan_results['W_fan']
+    # the preheat coil heats the mixed air to the temperature at the fan
+    # inlet; if the mixed air is warmer, the cooling coil cools it
+    T_coil_out = T_supply - dT_fan
+    return {
+        'T_supply': T_supply,
+        'W_supply': W_supply,
+        'm_supply': m_supply,
+        'm_supply_tot': m_supply_tot,
+        'V_supply': V_supply,
+        'T_zone_supply': T_zone_supply,
+        'W_zone': W_zone,
+        'm_return': m_return_tot,
+        'T_return': T_return,
+        'W_return': W_return,
+        'm_vent': m_vent,
+        'T_mixed': T_mixed,
+        'W_mixed': W_mixed,
+        'dT_fan': dT_fan,
+        'W_fan': W_fan,
+        'T_cooled': T_coil_out,
+        'Q_preheat_coil': m_supply_tot * cp * np.maximum(T_coil_out - T_mixed, 0.0),
+        'Q_cooling_coil': m_supply_tot * cp * np.maximum(T_mixed - T_coil_out, 0.0),
+        'Q_reheat_coil': m_supply * cp[zone] * (T_zone_supply - T_supply[zone])
+    }
+
+
+def design_winter(
+    Q_sen: np.ndarray,
+    T_zone: np.ndarray,
+    T_outdoor: float,
+    W_outdoor: float,
+    V_vent: float,
+    T_supply_max: float,
+    T_supply_min: float,
+    m_supply_min: np.ndarray,
+    fan_pressure: float,
+    fan_efficiency: float,
+    Q_lat: Optional[np.ndarray] = None,
+    m_exhaust: Optional[np.ndarray] = None,
+    fan: Optional[Fan] = None,
+    T_preheat_out: Optional[float] = None,
+    P: float = psy.P_ATM
+) -> Dict[str, np.ndarray]:
+    """Winter design of a multi-zone VAV system with preheat and reheat
+    coils, sizing the reheat coils of all zones at once.
+
+    The procedure is that of `vav_multizone_design_p1`: zones with a heating
+    load get their load at `T_supply_max`, the other zones (interior zones
+    that still need cooling) at `T_supply_min`, but no zone gets less than
+    its minimum flow rate. From the flow rates follow the supply air
+    temperatures the zones need; the system supplies the lowest of them and
+    the reheat coils heat the air further for the other zones. The mixed air
+    is preheated to the fan inlet temperature.
+
+    Unlike `VAVSystem.design_winter`, the air need not be dry: the
+    humidity of the outdoor air and the latent loads of the zones are taken
+    into account (no humidifier). A `ValueError` is raised if no outdoor
+    air is supplied (`V_vent` = 0): without ventilation the moisture the
+    zones add accumulates and there is no steady state.
+
+    Params: see `design_summer`, and:
+    - Q_sen : np.ndarray
+        Sensible design loads of the zones (W), negative for heat losses.
+    - T_supply_max : float
+        Maximum supply air temperature to the zones (°C).
+    - T_supply_min : float
+        Supply air temperature to the zones that need cooling (°C), e.g. the
+        summer design supply air temperature.
+    - m_supply_min : np.ndarray
+        Minimum supply air flow rates of the zones (kg/s), e.g. a fraction of
+        the summer design flow rates.
+    - Q_lat : np.ndarray, optional
+        Latent loads of the zones (W); zero if omitted.
+    - fan : batch.fans.Fan, optional
+        See `part_load_summer`.
+    - T_preheat_out : float, optional
+        Nominal leaving air temperature of the preheat coil (°C), used for
+        its peak load. The book takes the cooling coil leaving temperature of
+        the summer design. Defaults to the fan inlet temperature in winter.
+
+    Returns a dict with the zone supply air flow rates `m_supply`, the zone
+    supply air temperatures `T_zone_supply` and the reheat coil loads
+    `Q_reheat_coil` (arrays), and the states, flow rates and loads of the
+    system (floats), among which the preheat coil load at design conditions
+    `Q_preheat_coil` and the peak preheat coil load `Q_preheat_coil_peak`
+    (heating the ventilation air alone to `T_preheat_out`).
+    """
+    Q_sen, T_zone = (np.asarray(a, dtype=float) for a in (Q_sen, T_zone))
+    Q_lat = np.zeros_like(Q_sen) if Q_lat is None else np.asarray(Q_lat, dtype=float)
+    m_exhaust = np.zeros_like(Q_sen) if m_exhaust is None else np.asarray(m_exhaust, dtype=float)
+    results = _winter_results(
+        Q_sen, Q_lat, T_zone, m_exhaust, T_outdoor, W_outdoor, V_vent, T_supply_max, T_supply_min,
+        np.asarray(m_supply_min, dtype=float), fan_pressure, fan_efficiency, fan, P
+    )
+    T_preheat_out = results['T_cooled'] if T_preheat_out is None else T_preheat_out
+    results['Q_preheat_coil_peak'] = (
+        results['m_vent'] * psy.cp_humid(W_outdoor) * max(T_preheat_out - T_outdoor, 0.0)
+    )
+    return {k: v.item() if np.ndim(v) == 0 else v for k, v in results.items()}
+
+
+def winter_season(
+    Q_sen: np.ndarray,
+    T_zone: np.ndarray,
+    T_outdoor: np.ndarray,
+    W_outdoor: np.ndarray,
+    V_vent: float,
+    T_supply_max: float,
+    T_supply_min: float,
+    m_supply_min: np.ndarray,
+    fan_pressure: float,
+    fan_efficiency: float,
+    Q_lat: Optional[np.ndarray] = None,
+    m_exhaust: Optional[np.ndarray] = None,
+    fan: Optional[Fan] = None,
+    dt: float = 3600.0,
+    P: float = psy.P_ATM
+) -> Dict[str, np.ndarray]:
+    """Operation of a multi-zone VAV system during a heating season, all
+    hours at once, with the procedure of `design_winter` applied to every
+    hour.
+
+    Params: see `design_winter`, but:
+    - Q_sen, Q_lat : np.ndarray
+        Zone loads per hour, shape (number of hours, number of zones).
+    - T_outdoor, W_outdoor : np.ndarray
+        Outdoor air states per hour (hourly weather data).
+    - dt : float
+        Length of a time step (s).
+
+    Returns a dict with the results of `design_winter` for every hour (the
+    system quantities have one element per hour, the zone quantities have
+    shape (number of hours, number of zones)), and the energy (J) over the
+    season of the preheat coil `E_preheat_coil`, the cooling coil
+    `E_cooling_coil`, the supply fan `E_fan` and the reheat coils
+    `E_reheat_coil` (one element per zone).
+    """
+    T_outdoor, W_outdoor = np.broadcast_arrays(np.asarray(T_outdoor, dtype=float), np.asarray(W_outdoor, dtype=float))
+    shape = T_outdoor.shape + np.shape(T_zone)
+    Q_sen = np.broadcast_to(np.asarray(Q_sen, dtype=float), shape)
+    Q_lat = np.zeros(shape) if Q_lat is None else np.broadcast_to(np.asarray(Q_lat, dtype=float), shape)
+    m_exhaust = np.zeros(np.shape(T_zone)) if m_exhaust is None else np.asarray(m_exhaust, dtype=float)
+    results = _winter_results(
+        Q_sen, Q_lat, np.asarray(T_zone, dtype=float), m_exhaust, T_outdoor, W_outdoor, V_vent,
+        T_supply_max, T_supply_min, np.asarray(m_supply_min, dtype=float), fan_pressure, fan_efficiency, fan, P
+    )
+    results['E_preheat_coil'] = results['Q_preheat_coil'].sum() * dt
+    results['E_cooling_coil'] = results['Q_cooling_coil'].sum() * dt
+    results['E_fan'] = np.sum(results['W_fan']) * dt
+    results['E_reheat_coil'] = results['Q_reheat_coil'].sum(axis=0) * dt
+    return results
@@ -0,0 +1,191 @@
+"""Zone data of a multi-zone VAV system stored column by column.
+
+`VAVSystem` keeps its zones as a list of `Zone` objects, each with a `summer`
+and a `winter` `Season` object holding pint quantities. A `ZoneTable` holds the
+same data as one NumPy array per attribute and per season (a struct of
+arrays, in SI units), so that quantities of all zones are computed with one
+vectorized expression::
+
+    zones = ZoneTable.from_zones([zone_A, zone_B])
+    results = vav.design_summer(**zones.summer.zone_inputs(), T_outdoor=..., ...)
+    zones.summer.store(results)
+    V_supply_tot = zones.summer.V_supply.sum()
+
+Indexing the table returns a `ZoneView`, a lightweight object with the
+attributes of a `Zone` (`name`, `summer`, `winter`) that reads and writes the
+columns of the table, so code that handles one zone at a time keeps working.
+
+Units of the columns (see also `batch.psychrometrics`):
+- Q_sen, Q_lat : W
+- T_zone, T_supply, T_return : °C
+- W_zone, W_supply, W_return : kg_H2O/kg_da
+- m_exhaust, m_supply : kg_da/s
+"""
+from typing import Dict, Iterator, Optional, Sequence, Union
+
+import numpy as np
+
+from . import psychrometrics as psy
+
+
+# design data of the zones
+INPUT_FIELDS = ('Q_sen', 'Q_lat', 'T_zone', 'W_zone', 'm_exhaust')
+# results of the system calculations
+RESULT_FIELDS = ('m_supply', 'T_supply', 'W_supply', 'T_return', 'W_return')
+
+
+class SeasonColumns:
+    """The design data and results of all zones for one season, one array
+    per attribute. Results that are not calculated yet are NaN."""
+    def __init__(self, n: int, **columns: np.ndarray):
+        unknown = set(columns) - set(INPUT_FIELDS + RESULT_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown zone attributes: {', '.join(sorted(unknown))}")
+        for name in INPUT_FIELDS + RESULT_FIELDS:
+            default = 0.0 if name == 'm_exhaust' else np.nan
+            column = np.full(n, default) if name not in columns else np.asarray(columns[name], dtype=float)
+            if column.shape != (n,):
+                raise ValueError(f"column '{name}' must have {n} elements")
+            setattr(self, name, column)
+
+    def __len__(self) -> int:
+        return len(self.Q_sen)
+
+    @property
+    def m_return(self) -> np.ndarray:
+        return self.m_supply - self.m_exhaust
+
+    @property
+    def V_supply(self) -> np.ndarray:
+        return self.m_supply * psy.specific_volume(self.T_supply, self.W_supply)
+
+    def zone_inputs(self) -> Dict[str, np.ndarray]:
+        """The zone arguments of the `batch.vav` functions."""
+        return {'Q_sen': self.Q_sen, 'Q_lat': self.Q_lat, 'T_zone': self.T_zone, 'm_exhaust': self.m_exhaust}
+
+    def store(self, results: Dict[str, np.ndarray]):
+        """Copy the zone results returned by a `batch.vav` function into the
+        columns. The air returned from a zone has the state of the zone air.
+        In winter the air supplied to a zone is the air leaving its reheat
+        coil (`T_zone_supply`)."""
+        self.m_supply[:] = results['m_supply']
+        self.T_supply[:] = results.get('T_zone_supply', results['T_supply'])
+        self.W_supply[:] = results['W_supply']
+        self.T_return[:] = self.T_zone
+        self.W_return[:] = results['W_zone']
+
+
+class SeasonView:
+    """The attributes of one zone in a `SeasonColumns`, like a `Season`."""
+    __slots__ = ('_columns', '_index')
+
+    def __init__(self, columns: SeasonColumns, index: int):
+        object.__setattr__(self, '_columns', columns)
+        object.__setattr__(self, '_index', index)
+
+    def __getattr__(self, name: str) -> float:
+        if name not in INPUT_FIELDS + RESULT_FIELDS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return float(getattr(self._columns, name)[self._index])
+
+    def __setattr__(self, name: str, value: float):
+        if name not in INPUT_FIELDS + RESULT_FIELDS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        getattr(self._columns, name)[self._index] = value
+
+    @property
+    def m_return(self) -> float:
+        return self.m_supply - self.m_exhaust
+
+    @property
+    def V_supply(self) -> float:
+        return self.m_supply * float(psy.specific_volume(self.T_supply, self.W_supply))
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name):.6g}' for name in INPUT_FIELDS + RESULT_FIELDS)
+        return f'{type(self).__name__}({fields})'
+
+
+class ZoneView:
+    """One zone of a `ZoneTable`, with the attributes of a `Zone`."""
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'ZoneTable', index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._index]
+
+    @property
+    def summer(self) -> Optional[SeasonView]:
+        if self._table.summer is None:
+            return None
+        return SeasonView(self._table.summer, self._index)
+
+    @property
+    def winter(self) -> Optional[SeasonView]:
+        if self._table.winter is None:
+            return None
+        return SeasonView(self._table.winter, self._index)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(name={self.name!r})'
+
+
+class ZoneTable:
+    """The zones of a multi-zone VAV system as columns.
+
+    Params:
+    - names : Sequence[str]
+        Names of the zones.
+    - summer, winter : Dict[str, np.ndarray], optional
+        Columns of the summer and winter design data, keyed by the names in
+        `INPUT_FIELDS` (and optionally `RESULT_FIELDS`). A season that is
+        omitted is None, as in `Zone`.
+    """
+    def __init__(
+        self,
+        names: Sequence[str],
+        summer: Optional[Dict[str, np.ndarray]] = None,
+        winter: Optional[Dict[str, np.ndarray]] = None
+    ):
+        self.names = list(names)
+        n = len(self.names)
+        self.summer = SeasonColumns(n, **summer) if summer is not None else None
+        self.winter = SeasonColumns(n, **winter) if winter is not None else None
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_zones(cls, zones: Sequence) -> 'ZoneTable':
+        """Create a table from `Zone` objects of `hvac` (the design data of
+        the seasons are converted to SI units)."""
+        def columns(seasons):
+            if any(season is None for season in seasons):
+                return None
+            return {
+                'Q_sen': [s.Q_sen.to('W').m for s in seasons],
+                'Q_lat': [s.Q_lat.to('W').m for s in seasons],
+                'T_zone': [s.zone_air.Tdb.to('degC').m for s in seasons],
+                'W_zone': [s.zone_air.W.to('kg / kg').m for s in seasons],
+                'm_exhaust': [s.m_exhaust.to('kg / s').m for s in seasons]
+            }
+        return cls(
+            [zone.name for zone in zones],
+            summer=columns([zone.summer for zone in zones]),
+            winter=columns([zone.winter for zone in zones])
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, key: Union[int, str]) -> ZoneView:
+        if isinstance(key, str):
+            key = self._index[key]
+        elif not -len(self) <= key < len(self):
+            raise IndexError('zone index out of range')
+        return ZoneView(self, key % len(self))
+
+    def __iter__(self) -> Iterator[ZoneView]:
+        return (ZoneView(self, i) for i in range(len(self)))
@@ -0,0 +1,250 @@
+"""Benchmark the worked examples of the book.
+
+The examples in the notebooks are a realistic workload for `hvac`. This script
+measures:
+- the latency of the basic air conditioning processes of `airco_proc_01`
+  (sensible heating, cooling and dehumidification with ADP, evaporative
+  cooling, water and steam injection, adiabatic mixing);
+- the latency of the CAV and VAV design and part-load examples, by running the
+  code of their notebooks (without the charts);
+- the throughput of `HumidAir` and `AirConditioningProcess` over batches of
+  operating points;
+- the peak memory allocated by each example.
+
+The results can be saved as a baseline (`benchmark_baseline.json`). Later runs
+are compared with the baseline and the script exits with status 1 if an
+example has become slower than the baseline by more than the tolerance, so
+that it can be run as a CI step.
+
+Usage:
+    python benchmark.py [--sizes N [N ...]] [--repeat R] [--tolerance T] [--save-baseline]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from deps import load_packages
+
+
+BOOK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(BOOK_DIR, 'benchmark_baseline.json')
+
+NOTEBOOK_EXAMPLES = {
+    'cav_design': 'cav_design.ipynb',
+    'cav_vav_part_load': 'cav_vav_part_load.ipynb',
+    'vav_design': 'vav_multizone_design_p2.ipynb',
+    'vav_part_load': 'vav_multizone_analysis.ipynb'
+}
+
+
+def process_examples() -> Dict[str, Callable[[], None]]:
+    """Return the examples of `airco_proc_01` as functions."""
+    from hvac import Quantity as Q_
+    from hvac.fluids import HumidAir, Fluid
+    from hvac.air_conditioning import AirConditioningProcess, AirStream, AdiabaticMixing
+
+    Water = Fluid('Water')
+
+    def sensible_heating():
+        air_in = HumidAir(Tdb=Q_(21, 'degC'), Twb=Q_(15, 'degC'))
+        air_out = HumidAir(Tdb=Q_(41, 'degC'), W=air_in.W)
+        AirConditioningProcess(air_in=air_in, air_out=air_out, m_da=air_in.rho * Q_(1.5, 'm ** 3 / s')).Q
+
+    def cooling_dehumidification():
+        air_in = HumidAir(Tdb=Q_(28.0, 'degC'), Twb=Q_(20.6, 'degC'))
+        air_out = HumidAir(Tdb=Q_(12.5, 'degC'), W=Q_(8.336, 'g / kg'))
+        air_cooler = AirConditioningProcess(
+            air_in=air_in,
+            air_out=air_out,
+            m_da=air_in.rho * Q_(1.5, 'm ** 3 / s'),
+            m_w=Q_(0.0, 'kg / s'),
+            h_w=Q_(0.0, 'J / kg')
+        )
+        air_cooler.Q, air_cooler.ADP
+
+    def evaporative_cooling():
+        air_in = HumidAir(Tdb=Q_(15.0, 'degC'), Twb=Q_(10.0, 'degC'))
+        air_washer = AirConditioningProcess(
+            air_in=air_in,
+            beta=Q_(90.0, 'pct'),
+            ADP=HumidAir(Tdb=air_in.Twb, RH=Q_(100.0, 'pct')),
+            m_da=air_in.rho * Q_(1.5, 'm ** 3 / s'),
+            Q=Q_(0.0, 'W')
+        )
+        air_washer.air_out, air_washer.m_w
+
+    def water_injection():
+        air_in = HumidAir(Tdb=Q_(21.0, 'degC'), Twb=Q_(15.0, 'degC'))
+        water = Water(T=Q_(100.0, 'degC'), x=Q_(0.0, 'pct'))
+        AirConditioningProcess(
+            air_in=air_in,
+            m_da=Q_(1.0, 'kg / s'),
+            m_w=Q_(0.002, 'kg / s'),
+            h_w=water.h,
+            Q=Q_(0.0, 'W')
+        ).air_out
+
+    def steam_injection():
+        air_in = HumidAir(Tdb=Q_(28.0, 'degC'), Twb=Q_(11.9, 'degC'))
+        steam = Water(P=Q_(30.0, 'bar'), x=Q_(100, 'pct'))
+        AirConditioningProcess(
+            air_in=air_in,
+            m_da=Q_(1.0, 'kg / s'),
+            Q=Q_(0.0, 'W'),
+            h_w=steam.h,
+            m_w=Q_(0.01, 'kg / s')
+        ).air_out
+
+    def adiabatic_mixing():
+        return_air = AirStream(state=HumidAir(Tdb=Q_(26.0, 'degC'), RH=Q_(50.0, 'pct')), m_da=Q_(0.7, 'kg / s'))
+        outdoor_air = AirStream(state=HumidAir(Tdb=Q_(34.0, 'degC'), RH=Q_(60.0, 'pct')), m_da=Q_(0.3, 'kg / s'))
+        supply_air = AirStream(m_da=Q_(1.0, 'kg / s'))
+        AdiabaticMixing(in1=outdoor_air, in2=return_air, out=supply_air).stream_out.state
+
+    return {
+        'sensible_heating': sensible_heating,
+        'cooling_dehumidification': cooling_dehumidification,
+        'evaporative_cooling': evaporative_cooling,
+        'water_injection': water_injection,
+        'steam_injection': steam_injection,
+        'adiabatic_mixing': adiabatic_mixing
+    }
+
+
+def notebook_example(file_name: str) -> Callable[[], None]:
+    """Return a function that runs the code cells of a notebook, except the
+    cells that draw charts (those that create a `PsychrometricChart` or call
+    `show_chart`; the import cells are kept). Output of the display helpers
+    is discarded."""
+    with open(os.path.join(BOOK_DIR, file_name), encoding='utf-8') as fh:
+        nb = json.load(fh)
+    cells = []
+    for i, cell in enumerate(nb['cells']):
+        source = ''.join(cell['source'])
+        draws_chart = 'PsychrometricChart(' in source or 'show_chart(' in source
+        if cell['cell_type'] == 'code' and not draws_chart:
+            cells.append(compile(source, f'<{file_name} cell {i}>', 'exec'))
+
+    def run():
+        namespace = {'__name__': '__main__'}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for code in cells:
+                exec(code, namespace)
+    return run
+
+
+def batch_examples() -> Dict[str, Callable[[int], None]]:
+    """Return functions that solve `n` operating points."""
+    from hvac import Quantity as Q_
+    from hvac.fluids import HumidAir
+    from hvac.air_conditioning import AirConditioningProcess
+
+    def operating_points(n: int):
+        for i in range(n):
+            yield Q_(15.0 + 20.0 * (i % 101) / 100, 'degC'), Q_(30.0 + 50.0 * (i % 53) / 52, 'pct')
+
+    def humid_air(n: int):
+        for Tdb, RH in operating_points(n):
+            HumidAir(Tdb=Tdb, RH=RH).h
+
+    def sensible_heating(n: int):
+        for Tdb, RH in operating_points(n):
+            air_in = HumidAir(Tdb=Tdb, RH=RH)
+            air_out = HumidAir(Tdb=Tdb + Q_(20.0, 'K'), W=air_in.W)
+            AirConditioningProcess(air_in=air_in, air_out=air_out, m_da=Q_(1.0, 'kg / s')).Q
+
+    return {'humid_air': humid_air, 'sensible_heating': sensible_heating}
+
+
+def measure(func: Callable[[], None], repeat: int) -> Dict[str, float]:
+    """Run `func` once to warm up, then `repeat` times; return the median
+    and minimum time and the peak memory allocated during one run."""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    # tracemalloc slows down execution: measure memory in a separate run
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': statistics.median(times), 'min_seconds': min(times), 'peak_bytes': peak}
+
+
+def run_benchmarks(sizes: List[int], repeat: int) -> Dict[str, Dict[str, float]]:
+    load_packages()
+    os.chdir(BOOK_DIR)  # the notebooks import `deps` and `jupyter_addons`
+    sys.path.insert(0, BOOK_DIR)
+    results = {}
+    for name, func in process_examples().items():
+        results[f'process/{name}'] = measure(func, repeat)
+    for name, file_name in NOTEBOOK_EXAMPLES.items():
+        results[f'notebook/{name}'] = measure(notebook_example(file_name), max(repeat // 5, 1))
+    for name, func in batch_examples().items():
+        for n in sizes:
+            result = measure(lambda: func(n), 1)
+            result['points_per_second'] = n / result['seconds']
+            results[f'batch/{name}/{n}'] = result
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Return the benchmarks that are slower than the baseline by more than
+    `tolerance` (a fraction)."""
+    return [
+        name for name, result in results.items()
+        if name in baseline and result['seconds'] > baseline[name]['seconds'] * (1.0 + tolerance)
+    ]
+
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]):
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}}  {'time':>10}  {'baseline':>10}  {'peak memory':>12}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        base = f"{base['seconds'] * 1e3:.1f} ms" if base else '-'
+        throughput = result.get('points_per_second')
+        throughput = f'  {throughput:.0f} points/s' if throughput else ''
+        print(
+            f"{name:<{width}}  {result['seconds'] * 1e3:>7.1f} ms  {base:>10}  "
+            f"{result['peak_bytes'] / 2 ** 20:>9.1f} MB{throughput}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the worked examples of the book.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000], help='batch sizes')
+    parser.add_argument('--repeat', type=int, default=10, help='number of timed runs per example')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown relative to the baseline')
+    parser.add_argument('--save-baseline', action='store_true', help=f'save the results to {os.path.basename(BASELINE_FILE)}')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.repeat)
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as fh:
+            baseline = json.load(fh)
+    print_results(results, baseline)
+    if args.save_baseline:
+        with open(BASELINE_FILE, 'w') as fh:
+            json.dump(results, fh, indent=2)
+        return
+    slower = compare(results, baseline, args.tolerance)
+    if slower:
+        print(f'\nslower than the baseline by more than {args.tolerance:.0%}: ' + ', '.join(slower))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+"""Build the book with cached, incremental notebook execution.
+
+Jupyter Book (`execute_notebooks: cache` in `_config.yml`) only re-executes a
+notebook when its code cells have changed. The notebooks also depend on the
+`hvac` package and on the book's own packages (`charts`, `jupyter_addons`,
+`batch`, `deps`), which Jupyter Book knows nothing about: this script
+therefore keys the execution cache on their sources as well, clearing the
+cache when they have changed. A cached notebook that refers to a chart image
+that is no longer in the chart store (`_static/charts`, which is not under
+version control) is executed again. After the build a timing report lists per notebook
+whether it was executed or taken from the cache and how long execution took.
+
+Jupyter Book executes notebooks one after another. The chapters of the book
+are independent of each other, so before calling Jupyter Book this script
+executes the notebooks that are not in the cache concurrently, each in a
+kernel of its own, and stores them in the cache. Kernels are started ahead of
+time with `hvac`, pint, CoolProp and the book's `charts` and `jupyter_addons`
+already imported. The notebooks draw their charts with `charts`, so
+`hvac.charts`, which imports matplotlib, is not imported. The build stops at
+the first notebook that fails.
+
+Usage:
+    python build_book.py [--clear-cache] [--jobs N]
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import re
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict
+
+from deps import load_packages
+
+
+BOOK_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILD_DIR = os.path.join(BOOK_DIR, '_build')
+CACHE_DIR = os.path.join(BUILD_DIR, '.jupyter_cache')
+CODE_KEY_FILE = os.path.join(CACHE_DIR, 'code_key.txt')
+# code and data of the book that the notebooks import or read
+BOOK_SOURCES = ('charts', 'jupyter_addons', 'batch', 'deps.py', 'my_styles.css')
+CHART_STORE = os.path.join(BOOK_DIR, '_static', 'charts')
+CHART_REF = re.compile(r'_static/charts/([0-9a-f]{64}\.svg)')
+REPORT_FILE = os.path.join(BUILD_DIR, 'execution_report.json')
+TIMEOUT = 600  # same as `execute: timeout` in _config.yml
+
+WARM_UP_CODE = """\
+def _warm_up():
+    import importlib
+    import deps
+    deps.load_packages()
+    for name in (
+        'pint', 'CoolProp.CoolProp', 'hvac', 'hvac.fluids', 'hvac.air_conditioning',
+        'charts.svg_chart', 'jupyter_addons'
+    ):
+        importlib.import_module(name)
+_warm_up()
+del _warm_up
+"""
+
+
+def _hash_sources(h, path: str, extensions=('.py', '.json', '.css')):
+    """Add the relative paths and contents of the source files in `path` (a
+    directory or a single file) to the hash `h`."""
+    if os.path.isfile(path):
+        with open(path, 'rb') as fh:
+            h.update(os.path.basename(path).encode())
+            h.update(fh.read())
+        return
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(extensions):
+                file_path = os.path.join(root, name)
+                h.update(os.path.relpath(file_path, path).encode())
+                with open(file_path, 'rb') as fh:
+                    h.update(fh.read())
+
+
+def code_key() -> str:
+    """Return a key that changes whenever the code the notebooks run changes.
+
+    The key is a hash of the source files of the `hvac` package, so that
+    editing a development checkout of `hvac` invalidates the cache just like
+    installing a new release does, and of the book's own packages and data
+    files (`BOOK_SOURCES`).
+    """
+    load_packages()
+    spec = importlib.util.find_spec('hvac')
+    if spec is None or not spec.submodule_search_locations:
+        raise ModuleNotFoundError("package 'hvac' cannot be found: install it or set HVAC_PATH")
+    h = hashlib.sha256()
+    _hash_sources(h, list(spec.submodule_search_locations)[0], extensions=('.py',))
+    for name in BOOK_SOURCES:
+        h.update(name.encode())
+        _hash_sources(h, os.path.join(BOOK_DIR, name))
+    return h.hexdigest()
+
+
+def check_cache(key: str, clear: bool = False):
+    """Clear the execution cache if it was made with other code (see
+    `code_key`), or if `clear` is True."""
+    old_key = None
+    if os.path.exists(CODE_KEY_FILE):
+        with open(CODE_KEY_FILE) as fh:
+            old_key = fh.read().strip()
+    if clear or old_key != key:
+        if old_key is not None and not clear:
+            print('hvac or the book packages have changed: clearing the execution cache')
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        os.makedirs(CACHE_DIR)
+        with open(CODE_KEY_FILE, 'w') as fh:
+            fh.write(key)
+
+
+def missing_charts(nb) -> List[str]:
+    """Return the chart images that the outputs of notebook `nb` refer to but
+    that are not in the chart store."""
+    missing = []
+    for cell in nb.cells:
+        for output in cell.get('outputs', []):
+            html = output.get('data', {}).get('text/html', '')
+            for file_name in CHART_REF.findall(''.join(html)):
+                if not os.path.exists(os.path.join(CHART_STORE, file_name)):
+                    missing.append(file_name)
+    return missing
+
+
+def book_notebooks() -> List[str]:
+    """Return the paths of the notebooks listed in `_toc.yml`."""
+    import yaml
+    with open(os.path.join(BOOK_DIR, '_toc.yml')) as fh:
+        toc = yaml.safe_load(fh)
+    files = [toc['root']] + [chapter['file'] for chapter in toc.get('chapters', [])]
+    paths = [os.path.join(BOOK_DIR, f'{file}.ipynb') for file in files]
+    return [path for path in paths if os.path.exists(path)]
+
+
+# state of a worker process of `execute_notebooks`
+_kernels_to_start = None
+_stop = None
+_next_kernel = None
+
+
+def _start_kernel(force: bool = False):
+    """Start a kernel and let it import the modules of `WARM_UP_CODE`, without
+    waiting for it to be ready. Unless `force` is True, no kernel is started
+    once as many kernels have been started as there are notebooks."""
+    global _next_kernel
+    _next_kernel = None
+    with _kernels_to_start.get_lock():
+        if _stop.is_set() or (_kernels_to_start.value == 0 and not force):
+            return
+        _kernels_to_start.value -= 1
+    from jupyter_client.manager import AsyncKernelManager
+    from jupyter_core.utils import run_sync
+    # nbclient needs an asynchronous kernel client to notice that a kernel died
+    km = AsyncKernelManager(kernel_name='python3')
+    run_sync(km.start_kernel)(cwd=BOOK_DIR)
+    kc = km.client()
+    kc.start_channels()
+    msg_id = kc.execute(WARM_UP_CODE, silent=True, store_history=False)
+    _next_kernel = (km, kc, msg_id)
+
+
+def _shutdown_kernel():
+    from jupyter_core.utils import run_sync
+    if _next_kernel is not None:
+        km, kc, _ = _next_kernel
+        kc.stop_channels()
+        run_sync(km.shutdown_kernel)(now=True)
+
+
+def _init_worker(kernels_to_start, stop):
+    global _kernels_to_start, _stop
+    _kernels_to_start = kernels_to_start
+    _stop = stop
+    _start_kernel()
+    # a kernel that was started for a notebook that went to another worker
+    multiprocessing.util.Finalize(None, _shutdown_kernel, exitpriority=10)
+
+
+def _kill_on_stop(pid: int, done: threading.Event):
+    """Kill the kernel as soon as the build is stopped; nbclient then stops
+    executing the notebook with a `DeadKernelError`. Windows has no SIGKILL:
+    there `os.kill` with SIGTERM terminates the process."""
+    sig = getattr(signal, 'SIGKILL', signal.SIGTERM)
+    while not done.is_set():
+        if _stop.wait(0.5):
+            try:
+                os.kill(pid, sig)
+            except OSError:
+                # the kernel has already exited
+                pass
+            return
+
+
+def _execute_notebook(path: str):
+    """Execute a notebook in the kernel that was warmed up in advance; in the
+    meantime the kernel for the next notebook is started.
+
+    Returns the path, the executed notebook (as a JSON string, or None if
+    execution failed), the execution time and the error message if any.
+    """
+    import nbformat
+    from jupyter_core.utils import run_sync
+    from nbclient import NotebookClient
+    if _stop.is_set():
+        return path, None, 0.0, 'build stopped'
+    if _next_kernel is None:
+        _start_kernel(force=True)
+    km, kc, msg_id = _next_kernel
+    _start_kernel()
+    nb = nbformat.read(path, as_version=4)
+    done = threading.Event()
+    threading.Thread(target=_kill_on_stop, args=(km.provisioner.pid, done), daemon=True).start()
+    start = time.perf_counter()
+    try:
+        try:
+            while True:
+                reply = run_sync(kc.get_shell_msg)(timeout=TIMEOUT)
+                if reply['parent_header'].get('msg_id') == msg_id:
+                    break
+        finally:
+            kc.stop_channels()
+        if reply['content']['status'] != 'ok':
+            raise RuntimeError(f"importing hvac failed: {reply['content'].get('evalue')}")
+        start = time.perf_counter()
+        # no timing metadata in the cells: jupyter-cache hashes the cell metadata
+        NotebookClient(
+            nb, km=km, timeout=TIMEOUT, record_timing=False,
+            resources={'metadata': {'path': BOOK_DIR}}
+        ).execute()
+    except Exception as err:
+        return path, None, time.perf_counter() - start, str(err)
+    finally:
+        done.set()
+        run_sync(km.shutdown_kernel)(now=True)
+    return path, nbformat.writes(nb), time.perf_counter() - start, None
+
+
+def execute_notebooks(jobs: int):
+    """Execute the notebooks that are not in the execution cache (or whose
+    chart images are missing) concurrently and add them to the cache.
+
+    Each notebook runs in a kernel of its own. The notebooks are distributed
+    over `jobs` worker processes, and every worker starts the kernel for its
+    next notebook while the current one is executing. When a notebook fails,
+    the other workers kill their kernel and skip the remaining notebooks.
+    """
+    import nbformat
+    from jupyter_cache import get_cache
+    from jupyter_cache.base import CacheBundleIn
+
+    cache = get_cache(CACHE_DIR)
+    paths = []
+    for path in book_notebooks():
+        try:
+            record = cache.match_cache_notebook(nbformat.read(path, as_version=4))
+        except KeyError:
+            paths.append(path)
+            continue
+        # the chart store is not versioned: it may have been cleaned
+        if missing_charts(cache.get_cache_bundle(record.pk).nb):
+            print(f'{os.path.relpath(path, BOOK_DIR)}: chart images are missing, executing it again')
+            paths.append(path)
+    if not paths:
+        return
+    kernels_to_start = multiprocessing.Value('i', len(paths))
+    stop = multiprocessing.Event()
+    pool = multiprocessing.Pool(min(jobs, len(paths)), _init_worker, (kernels_to_start, stop))
+    try:
+        for path, nb, seconds, error in pool.imap_unordered(_execute_notebook, paths):
+            name = os.path.relpath(path, BOOK_DIR)
+            if error is not None:
+                raise RuntimeError(f'executing {name} failed:\n{error}')
+            bundle = CacheBundleIn(nbformat.reads(nb, as_version=4), path, data={'execution_seconds': seconds})
+            cache.cache_notebook_bundle(bundle, check_validity=False, overwrite=True)
+            print(f'executed {name} in {seconds:.1f} s')
+    except BaseException:
+        # fail fast
+        stop.set()
+        raise
+    finally:
+        # (`pool.terminate` cannot be used: nbclient ignores SIGTERM while
+        # executing a notebook in a kernel it did not start itself)
+        pool.close()
+        pool.join()
+
+
+def timing_report(build_start: float) -> List[Dict]:
+    """Return per notebook the execution time (from the execution cache) and
+    whether the notebook was executed during this build."""
+    from jupyter_cache import get_cache
+    build_start = datetime.utcfromtimestamp(build_start)  # the cache records UTC times
+    latest = {}
+    for record in get_cache(CACHE_DIR).list_cache_records():
+        name = os.path.relpath(record.uri, BOOK_DIR)
+        if name not in latest or record.created > latest[name].created:
+            latest[name] = record
+    report = []
+    for name, record in sorted(latest.items()):
+        report.append({
+            'notebook': name,
+            'execution_seconds': record.data.get('execution_seconds'),
+            'executed': record.created >= build_start
+        })
+    return report
+
+
+def print_report(report: List[Dict], build_time: float):
+    width = max([len(r['notebook']) for r in report] + [8])
+    print(f"\n{'notebook':<{width}}  {'status':<8}  {'exec. time':>10}")
+    for r in report:
+        status = 'executed' if r['executed'] else 'cached'
+        seconds = r['execution_seconds']
+        seconds = f'{seconds:.1f} s' if seconds is not None else '-'
+        print(f"{r['notebook']:<{width}}  {status:<8}  {seconds:>10}")
+    print(f'\ntotal build time: {build_time:.1f} s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the book with cached notebook execution.')
+    parser.add_argument('--clear-cache', action='store_true', help='re-execute all notebooks')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='number of notebooks executed in parallel')
+    args = parser.parse_args()
+
+    check_cache(code_key(), clear=args.clear_cache)
+    start = time.time()
+    execute_notebooks(max(args.jobs, 1))
+    subprocess.run(['jupyter-book', 'build', BOOK_DIR], check=True)
+    build_time = time.time() - start
+
+    report = timing_report(start)
+    with open(REPORT_FILE, 'w') as fh:
+        json.dump({'build_seconds': build_time, 'notebooks': report}, fh, indent=2)
+    print_report(report, build_time)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""Psychrometric chart rendering for the book.
+
+The chart classes are loaded on first use (PEP 562), so importing `charts`
+does not read the chart geometry or import the renderer.
+"""
+import importlib
+
+__all__ = ['PsychrometricChart', 'StatePoint']
+
+_lazy_attributes = {
+    'PsychrometricChart': '.svg_chart',
+    'StatePoint': '.svg_chart'
+}
+
+
+def __getattr__(name: str):
+    module_name = _lazy_attributes.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # next lookups do not go through __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
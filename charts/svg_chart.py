@@ -0,0 +1,268 @@
+"""Psychrometric chart drawn directly to SVG.
+
+The chart background (relative humidity, specific volume and wet-bulb lines)
+is read from `psych_chart.json`, which holds the same geometry as the
+matplotlib figure in `psych_chart.pickle`. Nothing in this module imports
+matplotlib, so it can be used in headless services that only need to produce
+a chart image.
+"""
+import hashlib
+import json
+import os
+from typing import NamedTuple, Optional, Tuple, List
+from xml.sax.saxutils import escape
+
+
+GEOMETRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'psych_chart.json')
+_geometry: Optional[dict] = None
+# hashes of the chart geometry and of this module, part of
+# `PsychrometricChart.cache_key`
+_geometry_hash: Optional[str] = None
+_renderer_hash: Optional[str] = None
+
+
+def load_geometry() -> dict:
+    """Return the precomputed chart geometry (read from disk only once)."""
+    global _geometry, _geometry_hash, _renderer_hash
+    if _geometry is None:
+        with open(GEOMETRY_FILE, 'rb') as fh:
+            content = fh.read()
+        _geometry = json.loads(content)
+        _geometry_hash = hashlib.sha256(content).hexdigest()
+        with open(os.path.abspath(__file__), 'rb') as fh:
+            _renderer_hash = hashlib.sha256(fh.read()).hexdigest()
+    return _geometry
+
+
+class StatePoint(NamedTuple):
+    """Point on the chart with plain float coordinates.
+
+    Params:
+    - Tdb : float
+        Dry-bulb temperature in °C.
+    - W : float
+        Humidity ratio in kg_H2O/kg_da.
+
+    Any object with attributes `Tdb` and `W` can be passed to the plot methods
+    of `PsychrometricChart`, including `hvac.charts.StatePoint` objects holding
+    `Quantity` values.
+    """
+    Tdb: float
+    W: float
+
+
+def _coordinates(point) -> Tuple[float, float]:
+    Tdb, W = point.Tdb, point.W
+    if hasattr(Tdb, 'to'):
+        Tdb = Tdb.to('degC').magnitude
+    if hasattr(W, 'to'):
+        W = W.to('kg / kg').magnitude
+    return float(Tdb), float(W)
+
+
+class PsychrometricChart:
+    """Psychrometric chart that renders to SVG instead of matplotlib.
+
+    The plot methods mirror those of `hvac.charts.PsychrometricChart`, so a
+    notebook cell only needs to change its import to switch renderer.
+
+    Params:
+    - fig_size : Tuple[float, float]
+        Width and height of the chart in inches.
+    - dpi : int
+        Number of SVG user units per inch.
+    """
+    line_styles = {
+        'RH': '#000000',
+        'v': '#0000ff',
+        'Twb': '#ff0000'
+    }
+    overlay_color = '#ffa500'
+    margins = (0.75, 0.25, 0.25, 0.6)  # left, right, top, bottom in inches
+
+    def __init__(self, fig_size: Tuple[float, float] = (8, 6), dpi: int = 96):
+        self.fig_size = fig_size
+        self.dpi = dpi
+        self._geometry = load_geometry()
+        self._overlays: List[str] = []
+
+    # coordinate transformation --------------------------------------------
+
+    @property
+    def _plot_area(self) -> Tuple[float, float, float, float]:
+        left, right, top, bottom = (m * self.dpi for m in self.margins)
+        width = self.fig_size[0] * self.dpi
+        height = self.fig_size[1] * self.dpi
+        return left, top, width - left - right, height - top - bottom
+
+    def _to_svg(self, Tdb: float, W: float) -> Tuple[float, float]:
+        x0, y0, w, h = self._plot_area
+        (x_min, x_max), (y_min, y_max) = self._geometry['x_lim'], self._geometry['y_lim']
+        x = x0 + (Tdb - x_min) / (x_max - x_min) * w
+        y = y0 + h - (W - y_min) / (y_max - y_min) * h
+        return round(x, 2), round(y, 2)
+
+    def _polyline(self, xs, ys, color: str, width: float, extra: str = '') -> str:
+        pts = ' '.join('{},{}'.format(*self._to_svg(x, y)) for x, y in zip(xs, ys))
+        return (
+            f'<polyline points="{pts}" fill="none" stroke="{color}" '
+            f'stroke-width="{width}"{extra}/>'
+        )
+
+    def _marker(self, Tdb: float, W: float, title: str = '') -> str:
+        x, y = self._to_svg(Tdb, W)
+        tooltip = f'<title>{escape(title)}</title>' if title else ''
+        return f'<circle cx="{x}" cy="{y}" r="4" fill="{self.overlay_color}">{tooltip}</circle>'
+
+    # plot methods ---------------------------------------------------------
+
+    def plot_process(self, name: str, start_point, end_point, mix_point=None):
+        """Draw an air conditioning process from `start_point` to `end_point`.
+
+        If `mix_point` is given, the process is an adiabatic mixing process:
+        both `start_point` and `end_point` are drawn towards the mixing point.
+        """
+        start, end = _coordinates(start_point), _coordinates(end_point)
+        group = [f'<g class="process"><title>{escape(name)}</title>']
+        if mix_point is None:
+            group.append(self._arrow(start, end))
+            group.extend([self._marker(*start), self._marker(*end)])
+        else:
+            mix = _coordinates(mix_point)
+            group.append(self._arrow(start, mix))
+            group.append(self._arrow(end, mix))
+            group.extend([self._marker(*start), self._marker(*end), self._marker(*mix)])
+        group.append('</g>')
+        self._overlays.append(''.join(group))
+
+    def plot_space_condition_line(self, start_point, end_point, space_point):
+        """Draw the space condition line through `space_point`."""
+        start, end = _coordinates(start_point), _coordinates(end_point)
+        space = _coordinates(space_point)
+        self._overlays.append(
+            '<g class="space-condition-line"><title>space condition line</title>'
+            + self._polyline((start[0], end[0]), (start[1], end[1]), self.overlay_color, 1.5)
+            + self._marker(*space, title='space')
+            + '</g>'
+        )
+
+    def plot_line(self, name: str, start_point, end_point):
+        """Draw a straight line between two points on the chart."""
+        start, end = _coordinates(start_point), _coordinates(end_point)
+        self._overlays.append(
+            f'<g class="line"><title>{escape(name)}</title>'
+            + self._polyline((start[0], end[0]), (start[1], end[1]), self.overlay_color, 1.5)
+            + '</g>'
+        )
+
+    def plot_point(self, name: str, point):
+        """Draw a single point on the chart."""
+        self._overlays.append(
+            f'<g class="point">{self._marker(*_coordinates(point), title=name)}</g>'
+        )
+
+    def _arrow(self, start: Tuple[float, float], end: Tuple[float, float]) -> str:
+        return self._polyline(
+            (start[0], end[0]), (start[1], end[1]), self.overlay_color, 1.5,
+            extra=' marker-end="url(#arrow)"'
+        )
+
+    # rendering ------------------------------------------------------------
+
+    def _background(self) -> List[str]:
+        g = self._geometry
+        x0, y0, w, h = self._plot_area
+        items = ['<g class="grid" stroke="#b0b0b0" stroke-width="0.8">']
+        for t in g['x_ticks']:
+            x, _ = self._to_svg(t, g['y_lim'][0])
+            items.append(f'<line x1="{x}" y1="{y0}" x2="{x}" y2="{y0 + h}"/>')
+        for t in g['y_ticks']:
+            _, y = self._to_svg(g['x_lim'][0], t)
+            items.append(f'<line x1="{x0}" y1="{y}" x2="{x0 + w}" y2="{y}"/>')
+        items.append('</g>')
+        items.append('<g class="chart-lines" clip-path="url(#plot-area)">')
+        for line in g['lines']:
+            width = 1.5 if line['bold'] else 0.5
+            items.append(self._polyline(line['x'], line['y'], self.line_styles[line['kind']], width))
+        items.append('</g>')
+        return items
+
+    def _axes(self) -> List[str]:
+        g = self._geometry
+        x0, y0, w, h = self._plot_area
+        items = [
+            f'<rect x="{x0}" y="{y0}" width="{w}" height="{h}" fill="none" stroke="#000000"/>',
+            '<g class="ticks" font-family="sans-serif" font-size="11" fill="#000000">'
+        ]
+        for t in g['x_ticks']:
+            x, _ = self._to_svg(t, g['y_lim'][0])
+            items.append(f'<text x="{x}" y="{y0 + h + 15}" text-anchor="middle">{t:g}</text>')
+        for t in g['y_ticks']:
+            _, y = self._to_svg(g['x_lim'][0], t)
+            items.append(f'<text x="{x0 - 5}" y="{y + 4}" text-anchor="end">{t:.3f}</text>')
+        items.append('</g>')
+        items.append(
+            f'<text x="{x0 + w / 2}" y="{y0 + h + 35}" text-anchor="middle" '
+            f'font-family="sans-serif" font-size="12">{escape(g["x_label"])}</text>'
+        )
+        items.append(
+            f'<text transform="translate({x0 - 50},{y0 + h / 2}) rotate(-90)" text-anchor="middle" '
+            f'font-family="sans-serif" font-size="12">{escape(g["y_label"])}</text>'
+        )
+        return items
+
+    def cache_key(self) -> str:
+        """Return a hash of everything the SVG output depends on (the chart
+        geometry file, the source of this module, the size and style
+        attributes and the overlays), so the chart can be looked up in an
+        image store without rendering it."""
+        h = hashlib.sha256()
+        h.update(repr((_renderer_hash, _geometry_hash)).encode())
+        h.update(repr((self.fig_size, self.dpi, self.margins)).encode())
+        h.update(repr((sorted(self.line_styles.items()), self.overlay_color)).encode())
+        for overlay in self._overlays:
+            h.update(overlay.encode())
+        return h.hexdigest()
+
+    def to_svg(self) -> str:
+        """Return the chart as an SVG document (string)."""
+        width = self.fig_size[0] * self.dpi
+        height = self.fig_size[1] * self.dpi
+        x0, y0, w, h = self._plot_area
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">',
+            '<defs>',
+            f'<clipPath id="plot-area"><rect x="{x0}" y="{y0}" width="{w}" height="{h}"/></clipPath>',
+            '<marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" '
+            f'markerHeight="8" orient="auto-start-reverse"><path d="M 0 0 L 10 5 L 0 10 z" '
+            f'fill="{self.overlay_color}"/></marker>',
+            '</defs>',
+            f'<rect width="{width}" height="{height}" fill="#ffffff"/>',
+            *self._background(),
+            '<g class="overlays" clip-path="url(#plot-area)">',
+            *self._overlays,
+            '</g>',
+            *self._axes(),
+            '</svg>'
+        ]
+        return '\n'.join(parts)
+
+    def save(self, file_path: str):
+        """Write the chart to an SVG file."""
+        with open(file_path, 'w', encoding='utf-8') as fh:
+            fh.write(self.to_svg())
+
+    def show(self):
+        """Display the chart in a notebook (or return the SVG string if
+        IPython is not available)."""
+        svg = self.to_svg()
+        try:
+            from IPython.display import display, SVG
+        except ImportError:
+            return svg
+        # noinspection PyTypeChecker
+        display(SVG(svg))
+
+    def _repr_svg_(self) -> str:
+        return self.to_svg()
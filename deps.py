@@ -1,7 +1,33 @@
+"""Make the `hvac` package importable in the notebooks.
+
+`hvac` is developed in a separate project. The preferred set-up is to install
+it into the environment that runs the notebooks (e.g. `pip install -e
+<path to ProjectHVAC>`), so that it is found through the normal site-packages
+lookup. Otherwise the directory holding the `hvac` package can be given in the
+environment variable `HVAC_PATH` (several directories separated by
+`os.pathsep`).
+"""
+import importlib.util
+import os
 import sys
 
 
+DEFAULT_PATHS = [
+    "C:/Users/Tom/PycharmProjects/ProjectHVAC"
+]
+
+
 def load_packages():
-    sys.path.extend([
-        "C:/Users/Tom/PycharmProjects/ProjectHVAC"
-    ])
+    """Add the directories of `HVAC_PATH` (or the default development
+    checkout) to `sys.path`, unless `hvac` can already be imported.
+
+    Only directories that exist are added, so that imports do not have to
+    scan paths that are not there.
+    """
+    if importlib.util.find_spec('hvac') is not None:
+        return
+    paths = os.environ.get('HVAC_PATH')
+    paths = paths.split(os.pathsep) if paths else DEFAULT_PATHS
+    for path in paths:
+        if os.path.isdir(path) and path not in sys.path:
+            sys.path.append(path)
@@ -1,9 +1,65 @@
-from IPython.core.display import display, HTML
-import pandas as pd
+"""Helpers for displaying results in the notebooks of the book.
+
+IPython and pandas are only imported when something is displayed, so that
+importing this package stays cheap in scripts and worker processes that do not
+display anything.
+"""
+import hashlib
+import io
+import os
+from functools import lru_cache
+from typing import Optional
+
+from .profiling import profile
+
+
+BOOK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHART_STORE = os.path.join('_static', 'charts')
+CSS_FILE = os.path.join(BOOK_DIR, 'my_styles.css')
+# rows of a table (items of a list) displayed at once
+MAX_ROWS = 100
+
+
+def _html(html_str: str):
+    from IPython.display import HTML
+    return HTML(html_str)
+
+
+def _display_html(html_str: str):
+    from IPython.display import display
+    # noinspection PyTypeChecker
+    display(_html(html_str))
+
+
+@lru_cache(maxsize=None)
+def _read_css() -> str:
+    with open(CSS_FILE, encoding='utf-8') as fh:
+        return fh.read()
+
+
+def _has_display() -> bool:
+    """Return True if the code runs in an IPython kernel, i.e. if displayed
+    output ends up in a notebook."""
+    try:
+        from IPython import get_ipython
+    except ImportError:
+        return False
+    shell = get_ipython()
+    return shell is not None and getattr(shell, 'kernel', None) is not None
 
 
 def set_css():
-    return HTML('<style>{}</style><p>Loaded <code>my_styles.css</code></p>'.format(open('my_styles.css').read()))
+    """Return the style sheet of the book (`my_styles.css` in the book
+    directory) as HTML, to be displayed as the output of a notebook cell.
+
+    The file is read only once per session. The style sheet lives in the
+    output of the cell, so it is returned on every call (re-running the cell
+    must not leave the page without styles); outside a kernel (e.g. when the
+    code of a notebook is run as a script) the function returns None.
+    """
+    if not _has_display():
+        return None
+    return _html(f'<style>{_read_css()}</style><p>Loaded <code>my_styles.css</code></p>')
 
 
 # noinspection PyTypeChecker
@@ -14,26 +70,118 @@ def display_item(item: str):
     - item : str
         The item (string with HTML markup) to be displayed.
     """
-    display(HTML(item))
+    _display_html(item)
 
 
-def display_list(items):
+def display_list(items, max_items: Optional[int] = MAX_ROWS):
     """Display a list of items as an unordered HTML list.
 
     Params:
-    - items : List[str]
-        A list of items (strings with HTML markup) to be displayed
+    - items : Iterable[str]
+        The items (strings with HTML markup) to be displayed.
+    - max_items : int, optional
+        Maximum number of items displayed; the number of items left out is
+        shown below the list. None displays all items.
     """
-    html_str = "<ul>"
-    for item in items:
-        html_str += f"<li>{item}</li>"
-    html_str += "</ul>"
-    # noinspection PyTypeChecker
-    display(HTML(html_str))
+    items = list(items)
+    shown = items if max_items is None else items[:max_items]
+    html_parts = ['<ul>', *(f'<li>{item}</li>' for item in shown), '</ul>']
+    if len(shown) < len(items):
+        html_parts.append(f'<p>... {len(items) - len(shown)} more items</p>')
+    _display_html(''.join(html_parts))
 
 
-def display_table(df):
-    """Display a Pandas DataFrame or Series in a HTML table."""
-    if isinstance(df, pd.Series): df = df.to_frame(df.name)
-    # noinspection PyTypeChecker
-    display(HTML(f'<div class="my_table">{df.to_html()}</div>'))
+def display_table(df, max_rows: Optional[int] = MAX_ROWS, page: int = 0):
+    """Display a Pandas DataFrame or Series in a HTML table.
+
+    Large tables are displayed one page of `max_rows` rows at a time: only
+    the rows of the page are converted to HTML, followed by a line with the
+    position of the page in the table.
+
+    Params:
+    - df : pd.DataFrame | pd.Series | np.ndarray
+        The table. A NumPy structured array (e.g. records of
+        `batch.records`) is also accepted.
+    - max_rows : int, optional
+        Number of rows per page. None displays all rows.
+    - page : int
+        Index of the page to display (the first page is 0, -1 is the last
+        page).
+    """
+    import pandas as pd
+    n_rows = len(df)
+    if max_rows is None or n_rows <= max_rows:
+        start, stop, n_pages = 0, n_rows, 1
+    else:
+        n_pages = -(-n_rows // max_rows)
+        page %= n_pages
+        start = page * max_rows
+        stop = min(start + max_rows, n_rows)
+    window = df.iloc[start:stop] if hasattr(df, 'iloc') else df[start:stop]
+    if isinstance(window, pd.Series):
+        window = window.to_frame(window.name)
+    elif not isinstance(window, pd.DataFrame):
+        window = pd.DataFrame.from_records(window, index=range(start, stop))
+    html_parts = ['<div class="my_table">', window.to_html(), '</div>']
+    if n_pages > 1:
+        html_parts.append(f'<p>rows {start + 1}-{stop} of {n_rows} (page {page + 1} of {n_pages})</p>')
+    _display_html(''.join(html_parts))
+
+
+def _chart_content(chart):
+    """Return the SVG content of a chart and the key under which it is stored.
+
+    Charts that render themselves to SVG (`charts.PsychrometricChart`)
+    provide a `cache_key` computed from their inputs, so the SVG is only
+    rendered when it is not yet in the store. A matplotlib `Figure` is
+    rendered to SVG and the key is the hash of that content.
+    """
+    if hasattr(chart, 'to_svg'):
+        key = chart.cache_key()
+        return key, chart.to_svg
+    from matplotlib.figure import Figure
+    if not isinstance(chart, Figure):
+        raise TypeError(
+            f"cannot display a {type(chart).__name__}: pass a charts.PsychrometricChart "
+            f"or a matplotlib Figure"
+        )
+    import matplotlib
+    import matplotlib.pyplot as plt
+    buf = io.BytesIO()
+    with matplotlib.rc_context({'svg.hashsalt': 'jupyter_addons', 'svg.fonttype': 'none'}):
+        chart.savefig(buf, format='svg', metadata={'Date': None})
+    plt.close(chart)  # prevent the inline backend from embedding the figure as well
+    content = buf.getvalue().decode('utf-8')
+    return hashlib.sha256(buf.getvalue()).hexdigest(), lambda: content
+
+
+def show_chart(chart, inline: bool = False):
+    """Display a psychrometric chart by reference to a content-addressed image
+    store instead of embedding it in the notebook as a base64 PNG.
+
+    The chart is written to `_static/charts/<hash>.svg` in the book directory.
+    A chart that is already in the store is not written (or rendered) again.
+    The store is not under version control: the charts are written again
+    when the notebooks are executed for a build.
+
+    Params:
+    - chart : charts.PsychrometricChart | matplotlib.figure.Figure
+        The chart to be displayed.
+    - inline : bool
+        If True, the (compact) SVG is embedded in the notebook output instead
+        of being referenced.
+    """
+    key, render = _chart_content(chart)
+    if inline:
+        _display_html(f'<div class="my_chart">{render()}</div>')
+        return
+    file_name = f'{key}.svg'
+    file_path = os.path.join(BOOK_DIR, CHART_STORE, file_name)
+    if not os.path.exists(file_path):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = f'{file_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            fh.write(render())
+        os.replace(tmp_path, file_path)
+    src = '/'.join(CHART_STORE.split(os.sep) + [file_name])
+    _display_html(f'<div class="my_chart"><img src="{src}" alt="psychrometric chart"></div>')
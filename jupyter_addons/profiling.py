@@ -0,0 +1,255 @@
+"""Find out where the time goes when a calculation in a notebook is slow.
+
+`profile` records, while it is active, the number of calls and the time spent
+in the functions and methods of `hvac` and `charts` (e.g. `HumidAir.__init__`,
+the solve methods of `AirConditioningProcess`, `AdiabaticMixing`, `Fan` and
+`VAVSystem`), and in CoolProp, pint and matplotlib as a whole::
+
+    with ja.profile() as prof:
+        vav_system = VAVSystem(...)
+        results = vav_system.part_load_summer(...)
+    ja.display_table(prof.to_frame())
+
+The results can be exported as a dict, as JSON or as collapsed stacks, the
+input format of flame graph tools (`flamegraph.pl`, speedscope).
+
+Setting the environment variable `HVAC_PROFILE` to a file path profiles a
+whole session without changing any code: when `jupyter_addons` is imported a
+profiler is started, and its results are written to that file when the
+process (e.g. the notebook kernel) exits. Extension functions of modules
+that are imported after `jupyter_addons` are recorded as part of the
+function that calls them.
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+# (module prefix, aggregate): functions in modules with the given prefix are
+# recorded; if `aggregate` is True they are recorded as one stage named after
+# the prefix, otherwise each function is a stage of its own.
+DEFAULT_STAGES = [
+    ('hvac', False),
+    ('charts', False),
+    ('CoolProp', True),
+    ('pint', True),
+    ('matplotlib', True)
+]
+
+
+def _call_extension_function(func):
+    """Return a Python function that calls `func`. Calls of functions in
+    compiled extension modules do not always produce profiler events, calls
+    of the wrapper do (and are recorded as calls of `func`)."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+    return wrapper
+
+
+_WRAPPER_CODE = _call_extension_function(len).__code__
+
+
+class StageProfiler:
+    """Records call counts and inclusive times per stage.
+
+    Params:
+    - stages : List[Tuple[str, bool]], optional
+        The modules to record, see `DEFAULT_STAGES`.
+    """
+    def __init__(self, stages: Optional[List[Tuple[str, bool]]] = None):
+        self.stages = stages if stages is not None else DEFAULT_STAGES
+        self.calls: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        self.self_seconds: Dict[str, float] = {}
+        self.stacks: Dict[str, float] = {}
+        self._stage_of_code = {}
+        self._frames = []  # one entry per call, None if the call is not recorded
+        self._active = []  # [stage, start time, time in recorded callees]
+        self._previous = None
+        self._chained = False
+        self._patched = []
+
+    def _stage(self, module: Optional[str], qualname: str) -> Optional[str]:
+        if not module:
+            return None
+        for prefix, aggregate in self.stages:
+            if module == prefix or module.startswith(prefix + '.'):
+                return prefix if aggregate else f'{module}:{qualname}'
+        return None
+
+    def _trace(self, frame, event, arg):
+        if event == 'call':
+            code = frame.f_code
+            if code is _WRAPPER_CODE:
+                func = frame.f_locals['func']
+                stage = self._stage(func.__module__, func.__qualname__)
+            else:
+                try:
+                    stage = self._stage_of_code[code]
+                except KeyError:
+                    # (`co_qualname` is new in Python 3.11)
+                    qualname = getattr(code, 'co_qualname', code.co_name)
+                    stage = self._stage(frame.f_globals.get('__name__'), qualname)
+                    self._stage_of_code[code] = stage
+            self._push(stage)
+        elif event == 'c_call':
+            self._push(self._stage(getattr(arg, '__module__', None), getattr(arg, '__qualname__', '?')))
+        elif self._frames:  # 'return', 'c_return' or 'c_exception'
+            self._pop()
+        if self._chained:
+            # an enclosing profiler (e.g. the session profiler) keeps recording
+            self._previous(frame, event, arg)
+
+    def _push(self, stage: Optional[str]):
+        # calls within a stage of the same name (recursion, or all functions
+        # of an aggregated module) count as one call
+        if stage is None or (self._active and self._active[-1][0] == stage):
+            self._frames.append(None)
+            return
+        self._frames.append(stage)
+        self._active.append([stage, time.perf_counter(), 0.0])
+
+    def _pop(self):
+        stage = self._frames.pop()
+        if stage is None:
+            return
+        stage, start, in_callees = self._active.pop()
+        elapsed = time.perf_counter() - start
+        if all(s != stage for s, _, _ in self._active):
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + elapsed
+        self.self_seconds[stage] = self.self_seconds.get(stage, 0.0) + elapsed - in_callees
+        path = ';'.join([s for s, _, _ in self._active] + [stage])
+        self.stacks[path] = self.stacks.get(path, 0.0) + elapsed - in_callees
+        if self._active:
+            self._active[-1][2] += elapsed
+
+    def _in_stages(self, module: Optional[str]) -> bool:
+        return self._stage(module, '') is not None
+
+    def _patch_extension_functions(self):
+        # While profiling, the functions of compiled extension modules (the
+        # CoolProp functions) are replaced by wrappers, in their own module
+        # and in the recorded modules that imported them.
+        modules = [m for name, m in list(sys.modules.items()) if m is not None and self._in_stages(name)]
+        wrappers = {}
+        for module in modules:
+            for value in vars(module).values():
+                is_extension_function = (
+                    callable(value) and not isinstance(value, type)
+                    and not hasattr(value, '__code__') and hasattr(value, '__qualname__')
+                )
+                if is_extension_function and self._in_stages(getattr(value, '__module__', None)):
+                    wrappers.setdefault(id(value), _call_extension_function(value))
+        for module in modules:
+            for name, value in list(vars(module).items()):
+                wrapper = wrappers.get(id(value))
+                if wrapper is not None and wrapper.__wrapped__ is value:
+                    setattr(module, name, wrapper)
+                    self._patched.append((module, name, value))
+
+    def start(self):
+        self._patch_extension_functions()
+        self._previous = sys.getprofile()
+        self._chained = isinstance(getattr(self._previous, '__self__', None), StageProfiler)
+        sys.setprofile(self._trace)
+
+    def stop(self):
+        sys.setprofile(self._previous)
+        for module, name, value in self._patched:
+            setattr(module, name, value)
+        self._patched = []
+        # stages that were still running when the profiler was stopped
+        while self._frames:
+            self._pop()
+
+    def __enter__(self) -> 'StageProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Return per stage the number of calls, the inclusive time and the
+        time not spent in other stages (in seconds), slowest stage first."""
+        stages = sorted(self.calls, key=lambda s: self.seconds[s], reverse=True)
+        return {
+            stage: {
+                'calls': self.calls[stage],
+                'seconds': self.seconds[stage],
+                'self_seconds': self.self_seconds[stage]
+            }
+            for stage in stages
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def to_frame(self):
+        """Return the results of `as_dict` as a Pandas DataFrame."""
+        import pandas as pd
+        return pd.DataFrame.from_dict(self.as_dict(), orient='index')
+
+    def collapsed_stacks(self) -> str:
+        """Return the self times in microseconds per stack of stages, one
+        stack per line, in the collapsed format of flame graph tools."""
+        return '\n'.join(
+            f'{path} {round(seconds * 1e6)}'
+            for path, seconds in sorted(self.stacks.items())
+        )
+
+    def save(self, file_path: str):
+        """Write the results to a file: JSON if the file name ends with
+        '.json', collapsed stacks otherwise."""
+        with open(file_path, 'w', encoding='utf-8') as fh:
+            if file_path.endswith('.json'):
+                fh.write(self.to_json(indent=2))
+            else:
+                fh.write(self.collapsed_stacks() + '\n')
+
+
+@contextmanager
+def profile(file_path: Optional[str] = None, stages: Optional[List[Tuple[str, bool]]] = None):
+    """Profile the code in the `with` block with a `StageProfiler`.
+
+    Params:
+    - file_path : str, optional
+        File the results are written to when the block ends (see
+        `StageProfiler.save`).
+    - stages : List[Tuple[str, bool]], optional
+        The modules to record, see `DEFAULT_STAGES`.
+    """
+    profiler = StageProfiler(stages)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        if file_path:
+            profiler.save(file_path)
+
+
+def _start_session_profiler() -> Optional[StageProfiler]:
+    """Start profiling the session if `HVAC_PROFILE` is set, see the module
+    documentation."""
+    file_path = os.environ.get('HVAC_PROFILE')
+    if not file_path:
+        return None
+    profiler = StageProfiler()
+    profiler.start()
+
+    def save():
+        profiler.stop()
+        profiler.save(file_path)
+    atexit.register(save)
+    return profiler
+
+
+session_profiler = _start_session_profiler()